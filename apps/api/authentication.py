@@ -0,0 +1,187 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.permissions import SAFE_METHODS
+
+from apps.organizations.utils import set_current_organization, set_current_user
+
+
+class LocalTTLCache:
+    """
+    A small thread-safe, per-process LRU cache whose entries expire after `ttl` seconds.
+    """
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+_local_tokens = LocalTTLCache(
+    maxsize=settings.API_TOKEN_LOCAL_CACHE_SIZE,
+    ttl=settings.API_TOKEN_LOCAL_CACHE_TTL,
+)
+_organizations = LocalTTLCache(
+    maxsize=settings.API_TOKEN_LOCAL_CACHE_SIZE,
+    ttl=settings.API_TOKEN_LOCAL_CACHE_TTL,
+)
+
+
+def get_token_cache_key(key):
+    """Cache key for a token; the raw token is hashed so it never appears in Redis."""
+    return 'api:token:v2:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+# User fields kept in the shared cache: enough for authorization checks, no
+# credentials. Other fields load from the database if a view reads them.
+TOKEN_USER_FIELDS = ('id', 'username', 'is_active', 'is_staff', 'is_superuser')
+
+
+def _dump_token(token):
+    return (token.key,) + tuple(getattr(token.user, field) for field in TOKEN_USER_FIELDS)
+
+
+def _load_token(value):
+    """Rebuild a Token and a (deferred) User from `_dump_token` output."""
+    from rest_framework.authtoken.models import Token
+    key, *user_values = value
+    user_model = get_user_model()
+    user = _from_db(user_model, dict(zip(TOKEN_USER_FIELDS, user_values)))
+    token = _from_db(Token, {'key': key, 'user_id': user.pk})
+    token.user = user
+    return token
+
+
+def _from_db(model, values):
+    # Model.from_db takes the given values in concrete field order and
+    # defers every other field
+    field_names = [field.attname for field in model._meta.concrete_fields if field.attname in values]
+    return model.from_db(DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names])
+
+
+def get_organization_cache_key(user_id):
+    return f'api:organization:{user_id}'
+
+
+def get_active_organization(user):
+    """
+    Return the user's first active organization (or None). Token requests
+    have no session, so this is what OrganizationMiddleware's session lookup
+    is for them. Cached like tokens, in this process and in Redis, and
+    invalidated when a membership or organization changes
+    (see apps.organizations.signals).
+    """
+    organization = _organizations.get(user.pk)
+    if organization is None:
+        cache_key = get_organization_cache_key(user.pk)
+        organization = cache.get(cache_key)
+        if organization is None:
+            from apps.organizations.models import OrganizationMembership
+            membership = OrganizationMembership.objects.filter(
+                user_id=user.pk,
+                status='active'
+            ).select_related('organization').first()
+            organization = membership.organization if membership else False
+            cache.set(cache_key, organization, settings.API_TOKEN_CACHE_TTL)
+        _organizations.set(user.pk, organization)
+    return organization or None
+
+
+def invalidate_active_organization(user_id):
+    """
+    Drop a user's cached organization from Redis and from this process.
+
+    Other processes keep their local entry for at most API_TOKEN_LOCAL_CACHE_TTL seconds.
+    """
+    _organizations.delete(user_id)
+    cache.delete(get_organization_cache_key(user_id))
+
+
+def invalidate_token(key):
+    """
+    Drop a token from the Redis cache and from this process's local cache.
+
+    Other processes keep their local entry for at most API_TOKEN_LOCAL_CACHE_TTL seconds.
+    """
+    _local_tokens.delete(key)
+    cache.delete(get_token_cache_key(key))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that caches the token (with its user) instead of
+    querying `authtoken_token` joined with `auth_user` on every request.
+    Redis holds only the token key and the user's non-secret
+    TOKEN_USER_FIELDS, never the password hash.
+
+    Lookups go to a per-process LRU first, then Redis (API_TOKEN_CACHE_TTL),
+    and only then to the database. Entries are invalidated when a token is
+    deleted or its user is updated or deactivated (see apps.users.signals).
+
+    A successful authentication also sets the organization context (as
+    OrganizationMiddleware does for sessions), so tenant-scoped managers
+    such as `Sales.objects` are filtered for token requests too.
+    """
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            user = result[0]
+            organization = get_active_organization(user)
+            if (organization and not organization.is_active and not user.is_superuser
+                    and request.method not in SAFE_METHODS):
+                # The restriction OrganizationMiddleware applies to sessions
+                raise exceptions.PermissionDenied(
+                    _('This organization is currently inactive. Contact the organization owner or an administrator.')
+                )
+            set_current_user(user)
+            set_current_organization(organization)
+            request._request.organization = organization
+        return result
+
+    def authenticate_credentials(self, key):
+        token = _local_tokens.get(key)
+        if token is None:
+            cache_key = get_token_cache_key(key)
+            value = cache.get(cache_key)
+            if value is None:
+                user, token = super().authenticate_credentials(key)
+                cache.set(cache_key, _dump_token(token), settings.API_TOKEN_CACHE_TTL)
+            else:
+                token = _load_token(value)
+            _local_tokens.set(key, token)
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (token.user, token)
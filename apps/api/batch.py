@@ -0,0 +1,108 @@
+import contextvars
+import json
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from django.utils.encoding import iri_to_uri
+
+
+def build_sub_request(request, method, path, body=None):
+    """
+    Build an HttpRequest for one batch item from the parent request.
+
+    The parent's authenticated user and token are forced onto the sub-request
+    (DRF honours `_force_auth_user`/`_force_auth_token`), and the organization
+    resolved by OrganizationMiddleware is reused, so neither runs again.
+    """
+    path, _, query_string = path.partition('?')
+    sub_request = HttpRequest()
+    sub_request.method = method.upper()
+    sub_request.path = sub_request.path_info = path
+    sub_request.META = {
+        **request.META,
+        'REQUEST_METHOD': sub_request.method,
+        'PATH_INFO': path,
+        'QUERY_STRING': iri_to_uri(query_string),
+    }
+    sub_request.GET = QueryDict(query_string)
+
+    payload = b'' if body is None else json.dumps(body).encode('utf-8')
+    sub_request.META['CONTENT_TYPE'] = 'application/json'
+    sub_request.META['CONTENT_LENGTH'] = str(len(payload))
+    sub_request._stream = BytesIO(payload)
+    sub_request._read_started = False
+
+    sub_request.session = getattr(request._request, 'session', None)
+    sub_request.user = request.user
+    sub_request.organization = getattr(request._request, 'organization', None)
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    return sub_request
+
+
+def run_sub_request(request, item):
+    """Resolve and run one batch item, returning `{'status', 'body'}`."""
+    method = str(item.get('method', 'GET')).upper()
+    path = item.get('path')
+    if not isinstance(path, str) or not path.startswith('/api/') or path.startswith('/api/batch/'):
+        return {'status': 400, 'body': {'message': 'Invalid path.', 'success': False}}
+
+    sub_request = build_sub_request(request, method, path, item.get('body'))
+    try:
+        match = resolve(sub_request.path_info)
+        if iscoroutinefunction(match.func):
+            response = async_to_sync(match.func)(sub_request, *match.args, **match.kwargs)
+        else:
+            response = match.func(sub_request, *match.args, **match.kwargs)
+    except (Resolver404, Http404):
+        return {'status': 404, 'body': {'message': 'Not found.', 'success': False}}
+    if hasattr(response, 'render'):
+        response.render()
+
+    content = b''.join(response.streaming_content) if response.streaming else response.content
+    if response.get('Content-Type', '').startswith('application/json'):
+        body = json.loads(content) if content else None
+    else:
+        body = content.decode(response.charset or 'utf-8')
+    return {'status': response.status_code, 'body': body}
+
+
+def _run_in_thread(context, request, item):
+    try:
+        return context.run(run_sub_request, request, item)
+    finally:
+        connections.close_all()
+
+
+def run_batch(request, items, concurrent=False):
+    """
+    Run batch items in order. With `concurrent`, each run of consecutive GET
+    items executes on a thread pool (writes act as barriers, so reads still see
+    earlier writes in the batch).
+    """
+    results = []
+    reads = []
+
+    def flush_reads():
+        if not reads:
+            return
+        with ThreadPoolExecutor(max_workers=settings.API_BATCH_MAX_WORKERS) as executor:
+            futures = [
+                executor.submit(_run_in_thread, contextvars.copy_context(), request, item)
+                for item in reads
+            ]
+            results.extend(future.result() for future in futures)
+        reads.clear()
+
+    for item in items:
+        if concurrent and str(item.get('method', 'GET')).upper() == 'GET':
+            reads.append(item)
+            continue
+        flush_reads()
+        results.append(run_sub_request(request, item))
+    flush_reads()
+    return results
@@ -0,0 +1,93 @@
+import datetime
+import hashlib
+from django.utils.cache import quote_etag
+from django.utils.http import http_date, urlencode
+from django.views.decorators.http import condition
+
+from apps.common.utils import get_sales_data_version
+from apps.organizations.utils import get_current_organization, get_current_user
+
+try:
+    from apps.common.models import Sales
+except:
+    pass
+
+
+def _representation_key(request):
+    """The parts of a request, besides the data, that change the response body."""
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    return f"{query}|{request.META.get('HTTP_ACCEPT', '')}"
+
+
+def _get_list_version():
+    """
+    `(scope, version)` of the Sales visible to the current request: the whole
+    table for superusers, else the current organization's records. Without
+    an organization the filtered manager returns no rows, so there is no version.
+    """
+    user = get_current_user()
+    if user and user.is_superuser:
+        return 'all', get_sales_data_version()
+    organization = get_current_organization()
+    if organization is None:
+        return 'none', None
+    return organization.id, get_sales_data_version(organization.id)
+
+
+def _get_row_version(request, pk):
+    """`(Version, UpdatedAt)` of one record, fetched once per request."""
+    if not hasattr(request, '_sales_row_version'):
+        request._sales_row_version = Sales.objects.filter(pk=pk).values_list('Version', 'UpdatedAt').first()
+    return request._sales_row_version
+
+
+def sales_etag(request, pk=None):
+    """
+    ETag for a Sales list or detail response.
+
+    Lists hash the query parameters with the data version of the request's
+    organization (bumped on every write), so no rows are read. Details hash
+    the record's `Version` with a single primary key lookup; missing records
+    get no ETag.
+    """
+    if pk is None:
+        version = '%s:%s' % _get_list_version()
+    else:
+        row = _get_row_version(request, pk)
+        if row is None:
+            return None
+        version = f'{pk}:{row[0]}'
+    return hashlib.sha1(f'{version}|{_representation_key(request)}'.encode()).hexdigest()
+
+
+def sales_last_modified(request, pk=None):
+    if pk is None:
+        scope, version = _get_list_version()
+        return datetime.datetime.fromtimestamp(version / 1e9, tz=datetime.timezone.utc) if version else None
+    row = _get_row_version(request, pk)
+    return row[1] if row else None
+
+
+# Answers If-None-Match / If-Modified-Since with 304 before the view runs.
+sales_condition = condition(etag_func=sales_etag, last_modified_func=sales_last_modified)
+
+
+def get_sales_validators(request, pk=None):
+    """
+    Return `(etag, last_modified)` in the form `get_conditional_response`
+    expects, for views that cannot use `sales_condition` (e.g. async views).
+    """
+    etag = sales_etag(request, pk)
+    last_modified = sales_last_modified(request, pk)
+    return (
+        quote_etag(etag) if etag else None,
+        int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+def add_validator_headers(response, etag, last_modified):
+    if etag:
+        response.headers.setdefault('ETag', etag)
+    if last_modified and not response.has_header('Last-Modified'):
+        response.headers['Last-Modified'] = http_date(last_modified)
+    return response
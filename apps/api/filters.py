@@ -0,0 +1,98 @@
+from django.core.exceptions import ValidationError
+
+from apps.api.serializers import SalesFastSerializer
+
+try:
+    from apps.common.models import Sales
+except:
+    pass
+
+
+class SalesQuery:
+    """
+    Parse and validate the projection, filter and ordering query parameters
+    accepted by the Sales list endpoints.
+
+    - `fields=ID,Product,Price` limits the columns returned.
+    - `PurchaseDate__gte`/`PurchaseDate__lte` and `Price__gte`/`Price__lte`
+      filter on ranges, `Country` and `Currency` on equality.
+    - `ordering=-PurchaseDate,Price` sorts the result on `ordering_fields_allowed`
+      (the columns of the organization-led indexes); `ID` is always appended
+      as a tie-breaker so cursors stay stable. Cursor positions are taken from
+      the leading ordering field, so rows where that field is NULL are left out
+      of the ordered listing.
+
+    Every name is checked against the serialized fields and every value is
+    converted with the model field's `clean()`, so only indexed, well-typed
+    lookups reach the database. Problems are collected in `errors`, keyed by parameter name.
+    """
+    filter_lookups = {
+        'PurchaseDate': ('gte', 'lte'),
+        'Price': ('gte', 'lte'),
+        'Country': ('exact',),
+        'Currency': ('exact',),
+    }
+    # Each is the second column of a Sales (organization, ...) index
+    ordering_fields_allowed = ('ID', 'PurchaseDate', 'Product', 'Country', 'Currency', 'Price')
+
+    def __init__(self, query_params):
+        self.errors = {}
+        self.field_names = SalesFastSerializer().field_names
+        self.fields = self.parse_fields(query_params.get('fields'))
+        self.filters = self.parse_filters(query_params)
+        self.ordering = self.parse_ordering(query_params.get('ordering'))
+
+    def is_valid(self):
+        return not self.errors
+
+    def parse_fields(self, value):
+        if not value:
+            return None
+        fields = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = [name for name in fields if name not in self.field_names]
+        if unknown:
+            self.errors['fields'] = [f'Unknown field: {name}' for name in unknown]
+        return fields
+
+    def parse_filters(self, query_params):
+        filters = {}
+        for field_name, lookups in self.filter_lookups.items():
+            field = Sales._meta.get_field(field_name)
+            for lookup in lookups:
+                param = field_name if lookup == 'exact' else f'{field_name}__{lookup}'
+                value = query_params.get(param)
+                if value in (None, ''):
+                    continue
+                try:
+                    filters[param] = field.clean(value, None)
+                except ValidationError as e:
+                    self.errors[param] = e.messages
+        return filters
+
+    def parse_ordering(self, value):
+        if not value:
+            return ('ID',)
+        ordering = []
+        for term in (term.strip() for term in value.split(',')):
+            if not term:
+                continue
+            name = term.lstrip('-')
+            if name not in self.ordering_fields_allowed:
+                message = f'Cannot order by: {name}' if name in self.field_names else f'Unknown field: {name}'
+                self.errors.setdefault('ordering', []).append(message)
+                continue
+            ordering.append(term)
+        if not any(term.lstrip('-') == 'ID' for term in ordering):
+            ordering.append('ID')
+        return tuple(ordering)
+
+    @property
+    def ordering_fields(self):
+        return [term.lstrip('-') for term in self.ordering]
+
+    def filter_queryset(self, queryset):
+        queryset = queryset.filter(**self.filters)
+        leading = Sales._meta.get_field(self.ordering_fields[0])
+        if leading.null:
+            queryset = queryset.filter(**{f'{leading.name}__isnull': False})
+        return queryset.order_by(*self.ordering)
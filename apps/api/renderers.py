@@ -0,0 +1,36 @@
+import json
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    return JSONEncoder().default(obj)
+
+
+def dumps(data):
+    """
+    Encode `data` to JSON bytes, using orjson when it is installed and the
+    standard library encoder (with DRF's type handling) otherwise.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(data, cls=JSONEncoder, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONRenderer(BaseRenderer):
+    """
+    JSON renderer backed by `dumps`, for endpoints that return large payloads.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return dumps(data)
@@ -10,5 +10,58 @@ class SalesSerializer(serializers.ModelSerializer):
             model = Sales
         except:
             pass    
-        fields = '__all__'
+        # Set from the organization context, never from the payload
+        exclude = ['organization']
+
+
+class SalesFastSerializer:
+    """
+    Read-only serializer for Sales that works on `values_list()` rows.
+
+    Column converters are derived from `SalesSerializer` once per instance
+    (i.e. once per request), so output matches the ModelSerializer while
+    skipping per-object serializer construction and field introspection.
+    `SalesSerializer` remains the serializer for writes and validation.
+    """
+    # Field types whose database value is already its JSON representation
+    passthrough_fields = (
+        serializers.CharField,
+        serializers.ChoiceField,
+        serializers.IntegerField,
+        serializers.FloatField,
+        serializers.BooleanField,
+    )
+
+    def __init__(self, fields=None):
+        serializer_fields = SalesSerializer().fields
+        self.field_names = [name for name in serializer_fields if fields is None or name in fields]
+        self.sources = [serializer_fields[name].source for name in self.field_names]
+        self.converters = [self.get_converter(serializer_fields[name]) for name in self.field_names]
+
+    def get_converter(self, field):
+        if isinstance(field, self.passthrough_fields):
+            return None
+        if isinstance(field, serializers.DateField) and not isinstance(field, serializers.DateTimeField):
+            return lambda value: value.isoformat()
+        return field.to_representation
+
+    def get_rows(self, queryset, extra_fields=()):
+        """
+        Return `queryset` as named `values_list` rows for this field set.
+
+        `extra_fields` are appended after the serialized columns (e.g. the
+        ordering fields a cursor needs) and are left out of the output.
+        """
+        sources = self.sources + [name for name in extra_fields if name not in self.sources]
+        return queryset.values_list(*sources, named=True)
+
+    def to_representation(self, row):
+        return {
+            name: value if value is None or converter is None else converter(value)
+            for name, converter, value in zip(self.field_names, self.converters, row)
+        }
+
+    def serialize(self, rows):
+        to_representation = self.to_representation
+        return [to_representation(row) for row in rows]
 
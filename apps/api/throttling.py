@@ -0,0 +1,161 @@
+import logging
+import math
+from django.conf import settings
+from rest_framework.authtoken.models import Token
+from rest_framework.throttling import BaseThrottle
+
+from apps.api.authentication import get_active_organization
+
+logger = logging.getLogger('apps.api.throttling')
+
+# Token bucket over any number of buckets (one per KEYS entry; ARGV holds
+# capacity and refill-per-millisecond pairs). A request is admitted only if
+# every bucket has a token, in which case one token is taken from each.
+# Returns {allowed, wait_ms, remaining_1, ..., remaining_n}.
+TOKEN_BUCKET_SCRIPT = """
+local now_t = redis.call('TIME')
+local now = tonumber(now_t[1]) * 1000 + math.floor(tonumber(now_t[2]) / 1000)
+local allowed = 1
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local refill = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill)
+    levels[i] = tokens
+    if tokens < 1 then
+        allowed = 0
+        wait = math.max(wait, math.ceil((1 - tokens) / refill))
+    end
+end
+local result = {allowed, wait}
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local refill = tonumber(ARGV[2 * i])
+    local tokens = levels[i]
+    if allowed == 1 then
+        tokens = tokens - 1
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / refill) + 1000)
+    result[i + 2] = math.floor(tokens)
+end
+return result
+"""
+
+_script = None
+
+
+def parse_rate(rate):
+    """Parse a DRF style rate such as '100/min' into `(num_requests, seconds)`."""
+    num, period = rate.split('/')
+    return int(num), {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+
+
+def get_token_bucket_script():
+    global _script
+    if _script is None:
+        from django_redis import get_redis_connection
+        _script = get_redis_connection('default').register_script(TOKEN_BUCKET_SCRIPT)
+    return _script
+
+
+def get_user_organization(request):
+    """
+    Return `(organization_id, throttle_rates)` for the request's user.
+
+    Session and token requests already carry `request.organization` (set by
+    OrganizationMiddleware or CachedTokenAuthentication); otherwise the first
+    active membership is used.
+    """
+    organization = getattr(request._request, 'organization', None)
+    if organization is None:
+        organization = get_active_organization(request.user)
+    if organization is None:
+        return None, {}
+    return organization.id, organization.settings.get('api_throttle_rates', {})
+
+
+class RedisRateThrottle(BaseThrottle):
+    """
+    Token bucket rate limiting shared by all workers through Redis.
+
+    Authenticated requests draw from a per-token (per-user) bucket and from a
+    per-organization bucket; anonymous requests draw from a per-IP bucket.
+    Default rates come from settings.API_THROTTLE_RATES and can be overridden
+    per organization with an `api_throttle_rates` entry in
+    `Organization.settings`, e.g. `{"token": "50/min", "organization": "500/min"}`.
+
+    Each check is a single EVALSHA of an atomic Lua script. If Redis is
+    unreachable the request is allowed and a warning is logged.
+    """
+    def get_buckets(self, request):
+        rates = dict(settings.API_THROTTLE_RATES)
+        if not request.user or not request.user.is_authenticated:
+            return [(f'throttle:anon:{self.get_ident(request)}', rates['anon'])]
+
+        organization_id, overrides = get_user_organization(request)
+        rates.update(overrides)
+        if isinstance(request.auth, Token):
+            buckets = [(f'throttle:token:{request.auth.user_id}', rates['token'])]
+        else:
+            buckets = [(f'throttle:user:{request.user.pk}', rates['token'])]
+        if organization_id:
+            buckets.append((f'throttle:organization:{organization_id}', rates['organization']))
+        return buckets
+
+    def allow_request(self, request, view):
+        self._wait = None
+        keys, args, limits = [], [], []
+        for key, rate in self.get_buckets(request):
+            num_requests, duration = parse_rate(rate)
+            keys.append(key)
+            args.extend([num_requests, num_requests / (duration * 1000)])
+            limits.append(num_requests)
+
+        try:
+            allowed, wait, *remaining = get_token_bucket_script()(keys=keys, args=args)
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+            return True
+
+        # Report the bucket closest to running out
+        index = min(range(len(remaining)), key=lambda i: remaining[i])
+        request.rate_limit = {
+            'limit': limits[index],
+            'remaining': max(0, remaining[index]),
+        }
+        if not allowed:
+            self._wait = wait / 1000
+            request.rate_limit['reset'] = math.ceil(self._wait)
+        return bool(allowed)
+
+    def wait(self):
+        return self._wait
+
+
+def add_rate_limit_headers(request, response):
+    """
+    Add `X-RateLimit-Limit` and `X-RateLimit-Remaining` headers (and
+    `X-RateLimit-Reset` when throttled) from the RedisRateThrottle state.
+    """
+    rate_limit = getattr(request, 'rate_limit', None)
+    if rate_limit:
+        response['X-RateLimit-Limit'] = rate_limit['limit']
+        response['X-RateLimit-Remaining'] = rate_limit['remaining']
+        if 'reset' in rate_limit:
+            response['X-RateLimit-Reset'] = rate_limit['reset']
+    return response
+
+
+class RateLimitHeadersMixin:
+    """
+    Add the rate limit headers to every response of an APIView.
+    `Retry-After` is set by DRF's exception handler on throttled requests.
+    """
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        return add_rate_limit_headers(request, response)
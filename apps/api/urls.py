@@ -4,5 +4,9 @@ from django.views.decorators.csrf import csrf_exempt
 from apps.api.views import *
 
 urlpatterns = [
+	re_path("sales/stream/$", SalesStreamView.as_view()),
+	re_path("sales/bulk/$", csrf_exempt(SalesBulkView.as_view())),
+	re_path("batch/$", csrf_exempt(BatchView.as_view())),
+	re_path("async/sales/((?P<pk>\d+)/)?", sales_async),
 	re_path("sales/((?P<pk>\d+)/)?", csrf_exempt(SalesView.as_view())),
 ]
\ No newline at end of file
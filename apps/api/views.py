@@ -1,48 +1,93 @@
+import math
 from http import HTTPStatus
-from django.http import Http404
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.generics import get_object_or_404
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 
+from apps.api.batch import run_batch
+from apps.api.conditional import add_validator_headers, get_sales_validators, sales_condition
+from apps.api.filters import SalesQuery
+from apps.api.pagination import SalesCursorPagination
+from apps.api.renderers import FastJSONRenderer, dumps
 from apps.api.serializers import *
+from apps.api.throttling import RateLimitHeadersMixin, add_rate_limit_headers
+from apps.common.utils import bump_sales_data_version
+from apps.organizations.utils import get_current_organization
 
 try:
     from apps.common.models import Sales
 except:
     pass
 
-class SalesView(APIView):
+def _get_organization():
+    """
+    Return `(organization, error_response)` for creating tenant-scoped records.
+    The organization comes from the request's organization context.
+    """
+    organization = get_current_organization()
+    if organization is None:
+        return None, Response(data={
+            'message': 'No active organization.',
+            'success': False
+        }, status=HTTPStatus.FORBIDDEN)
+    return organization, None
+
+
+class SalesView(RateLimitHeadersMixin, APIView):
     permission_classes = (IsAuthenticatedOrReadOnly,)
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer)
     
     def post(self, request):
+        organization, error = _get_organization()
+        if error:
+            return error
         serializer = SalesSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(data={
                 **serializer.errors,
                 'success': False
             }, status=HTTPStatus.BAD_REQUEST)
-        serializer.save()
+        serializer.save(organization=organization)
         return Response(data={
             'message': 'Record Created.',
             'success': True
         }, status=HTTPStatus.OK)
 
+    @method_decorator(sales_condition)
     def get(self, request, pk=None):
+        query = SalesQuery(request.query_params)
+        if not query.is_valid():
+            return Response(data={
+                **query.errors,
+                'success': False
+            }, status=HTTPStatus.BAD_REQUEST)
+        serializer = SalesFastSerializer(fields=query.fields)
         if not pk:
-            return Response({
-                'data': [SalesSerializer(instance=obj).data for obj in Sales.objects.all()],
-                'success': True
-            }, status=HTTPStatus.OK)
-        try:
-            obj = get_object_or_404(Sales, pk=pk)
-        except Http404:
+            paginator = SalesCursorPagination()
+            paginator.ordering = query.ordering
+            rows = serializer.get_rows(query.filter_queryset(Sales.objects.all()), query.ordering_fields)
+            page = paginator.paginate_queryset(rows, request, view=self)
+            return paginator.get_paginated_response(serializer.serialize(page))
+        row = serializer.get_rows(Sales.objects.filter(pk=pk)).first()
+        if row is None:
             return Response(data={
                 'message': 'object with given id not found.',
                 'success': False
             }, status=HTTPStatus.NOT_FOUND)
         return Response({
-            'data': SalesSerializer(instance=obj).data,
+            'data': serializer.to_representation(row),
             'success': True
         }, status=HTTPStatus.OK)
 
@@ -80,3 +125,303 @@ class SalesView(APIView):
             'success': True
         }, status=HTTPStatus.OK)
 
+
+
+class SalesStreamView(RateLimitHeadersMixin, APIView):
+    """
+    Stream Sales records as newline-delimited JSON (one object per line),
+    honouring the same `fields`, filter and `ordering` parameters as the list.
+
+    Rows are read from the database in chunks of `API_STREAM_CHUNK_SIZE` via
+    `QuerySet.iterator()`, so memory stays bounded regardless of table size.
+    """
+    permission_classes = (IsAuthenticatedOrReadOnly,)
+
+    @method_decorator(sales_condition)
+    def get(self, request):
+        query = SalesQuery(request.query_params)
+        if not query.is_valid():
+            return Response(data={
+                **query.errors,
+                'success': False
+            }, status=HTTPStatus.BAD_REQUEST)
+        serializer = SalesFastSerializer(fields=query.fields)
+        rows = serializer.get_rows(query.filter_queryset(Sales.objects.all())).iterator(
+            chunk_size=settings.API_STREAM_CHUNK_SIZE
+        )
+
+        def lines():
+            for row in rows:
+                yield dumps(serializer.to_representation(row)) + b'\n'
+
+        return StreamingHttpResponse(lines(), content_type='application/x-ndjson')
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _write_in_chunks(items, write):
+    """
+    Call `write` for each chunk of `items`, either inside one transaction for
+    the whole batch or one transaction per chunk (`API_BULK_COMMIT_PER_CHUNK`).
+    """
+    size = settings.API_BULK_CHUNK_SIZE
+    if settings.API_BULK_COMMIT_PER_CHUNK:
+        for chunk in _chunks(items, size):
+            with transaction.atomic():
+                write(chunk)
+    else:
+        with transaction.atomic():
+            for chunk in _chunks(items, size):
+                write(chunk)
+
+
+def _bulk_response(results, action):
+    succeeded = sum(1 for result in results if result['success'])
+    if succeeded == len(results):
+        status = HTTPStatus.OK
+    elif succeeded:
+        status = HTTPStatus.MULTI_STATUS
+    else:
+        status = HTTPStatus.BAD_REQUEST
+    return Response(data={
+        'data': sorted(results, key=lambda result: result['index']),
+        'message': f'{succeeded} of {len(results)} records {action}.',
+        'success': succeeded == len(results)
+    }, status=status)
+
+
+class SalesBulkView(RateLimitHeadersMixin, APIView):
+    """
+    Bulk variants of the Sales write operations.
+
+    Each method takes a JSON array (records for POST/PUT, IDs for DELETE),
+    validates every item in one pass with a single serializer instance, writes
+    the valid ones with `bulk_create`/`bulk_update`/one `DELETE ... IN` per
+    chunk and answers with one result per input item, in input order.
+    """
+    permission_classes = (IsAuthenticatedOrReadOnly,)
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer)
+
+    def get_items(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return None, Response(data={
+                'message': 'Expected a non-empty JSON array.',
+                'success': False
+            }, status=HTTPStatus.BAD_REQUEST)
+        if len(items) > settings.API_BULK_MAX_ITEMS:
+            return None, Response(data={
+                'message': f'At most {settings.API_BULK_MAX_ITEMS} items are allowed per request.',
+                'success': False
+            }, status=HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        return items, None
+
+    def post(self, request):
+        items, error = self.get_items(request)
+        if error:
+            return error
+        organization, error = _get_organization()
+        if error:
+            return error
+
+        serializer = SalesSerializer()
+        results, indexes, objs = [], [], []
+        for index, item in enumerate(items):
+            try:
+                validated_data = serializer.run_validation(item)
+            except ValidationError as e:
+                results.append({'index': index, 'success': False, 'errors': e.detail})
+                continue
+            indexes.append(index)
+            objs.append(Sales(**validated_data, organization=organization))
+
+        _write_in_chunks(objs, Sales.objects.bulk_create)
+        if objs:
+            bump_sales_data_version(organization.id)
+        for index, obj in zip(indexes, objs):
+            results.append({'index': index, 'success': True, 'ID': obj.pk})
+        return _bulk_response(results, 'created')
+
+    def put(self, request):
+        items, error = self.get_items(request)
+        if error:
+            return error
+
+        ids = [item.get('ID') for item in items if isinstance(item, dict)]
+        existing = Sales.objects.in_bulk([pk for pk in ids if isinstance(pk, int)])
+
+        serializer = SalesSerializer(partial=True)
+        results, objs, fields = [], [], set()
+        now = timezone.now()
+        for index, item in enumerate(items):
+            obj = existing.get(item.get('ID')) if isinstance(item, dict) else None
+            if obj is None:
+                results.append({'index': index, 'success': False, 'message': 'object with given id not found.'})
+                continue
+            try:
+                validated_data = serializer.run_validation(item)
+            except ValidationError as e:
+                results.append({'index': index, 'success': False, 'errors': e.detail})
+                continue
+            for attribute, value in validated_data.items():
+                setattr(obj, attribute, value)
+            obj.Version += 1
+            obj.UpdatedAt = now
+            fields.update(validated_data)
+            objs.append(obj)
+            results.append({'index': index, 'success': True, 'ID': obj.pk})
+
+        if objs and fields:
+            fields.update(('Version', 'UpdatedAt'))
+            _write_in_chunks(objs, lambda chunk: Sales.objects.bulk_update(chunk, sorted(fields)))
+            for organization_id in {obj.organization_id for obj in objs}:
+                bump_sales_data_version(organization_id)
+        return _bulk_response(results, 'updated')
+
+    def delete(self, request):
+        ids, error = self.get_items(request)
+        if error:
+            return error
+
+        found = {}
+
+        def delete_chunk(chunk):
+            queryset = Sales.objects.filter(ID__in=chunk)
+            found.update(queryset.values_list('ID', 'organization_id'))
+            queryset.delete()
+
+        _write_in_chunks([pk for pk in ids if isinstance(pk, int)], delete_chunk)
+        for organization_id in set(found.values()):
+            bump_sales_data_version(organization_id)
+        results = [
+            {'index': index, 'success': True, 'ID': pk} if pk in found else
+            {'index': index, 'success': False, 'message': 'object with given id not found.'}
+            for index, pk in enumerate(ids)
+        ]
+        return _bulk_response(results, 'deleted')
+
+
+class BatchView(RateLimitHeadersMixin, APIView):
+    """
+    Run several API calls in one HTTP request.
+
+    Body: `{"requests": [{"method": "GET", "path": "/api/sales/?page_size=10"},
+    {"method": "PUT", "path": "/api/sales/3/", "body": {...}}], "concurrent": true}`.
+
+    Sub-requests are resolved through the URL resolver and share this
+    request's authentication and organization context. Responses come back as
+    `{"status", "body"}` items in request order. With `concurrent`, runs of
+    consecutive GET sub-requests execute in parallel.
+    """
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (FastJSONRenderer, BrowsableAPIRenderer)
+
+    def post(self, request):
+        items = request.data.get('requests') if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items or not all(isinstance(item, dict) for item in items):
+            return Response(data={
+                'message': 'Expected a non-empty "requests" array of objects.',
+                'success': False
+            }, status=HTTPStatus.BAD_REQUEST)
+        if len(items) > settings.API_BATCH_MAX_REQUESTS:
+            return Response(data={
+                'message': f'At most {settings.API_BATCH_MAX_REQUESTS} requests are allowed per batch.',
+                'success': False
+            }, status=HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+
+        results = run_batch(request, items, concurrent=bool(request.data.get('concurrent')))
+        return Response({
+            'data': results,
+            'success': True
+        }, status=HTTPStatus.OK)
+
+
+def _json_response(data, status=HTTPStatus.OK):
+    return HttpResponse(dumps(data), status=status, content_type='application/json')
+
+
+def _check_request(request):
+    """
+    Run the configured API authentication and throttle classes for a plain
+    Django view. Returns `(drf_request, error_response_or_None)`.
+    """
+    drf_request = Request(
+        request,
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+    try:
+        drf_request.user
+    except APIException as e:
+        return drf_request, _json_response({
+            'detail': e.detail,
+            'success': False
+        }, status=e.status_code)
+
+    for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+        throttle = throttle_class()
+        if not throttle.allow_request(drf_request, None):
+            response = _json_response({
+                'detail': 'Request was throttled.',
+                'success': False
+            }, status=HTTPStatus.TOO_MANY_REQUESTS)
+            if throttle.wait() is not None:
+                response['Retry-After'] = '%d' % math.ceil(throttle.wait())
+            return drf_request, add_rate_limit_headers(drf_request, response)
+    return drf_request, None
+
+
+async def sales_async(request, pk=None):
+    """
+    ASGI-native read endpoint for Sales (list and detail).
+
+    Same parameters and response shape as `SalesView.get`, but rows are
+    fetched with the async ORM, so the worker is free while the database and
+    slow clients are waited on. Only GET is supported; writes go through
+    `SalesView` and `SalesBulkView`.
+    """
+    if request.method != 'GET':
+        return _json_response({
+            'message': 'Method not allowed.',
+            'success': False
+        }, status=HTTPStatus.METHOD_NOT_ALLOWED)
+
+    drf_request, error = await sync_to_async(_check_request)(request)
+    if error:
+        return error
+
+    etag, last_modified = await sync_to_async(get_sales_validators)(request, pk)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return add_rate_limit_headers(drf_request, add_validator_headers(response, etag, last_modified))
+
+    query = SalesQuery(request.GET)
+    if not query.is_valid():
+        return _json_response({
+            **query.errors,
+            'success': False
+        }, status=HTTPStatus.BAD_REQUEST)
+    serializer = SalesFastSerializer(fields=query.fields)
+
+    if not pk:
+        paginator = SalesCursorPagination()
+        paginator.ordering = query.ordering
+        rows = serializer.get_rows(query.filter_queryset(Sales.objects.all()), query.ordering_fields)
+        page = await paginator.apaginate_queryset(rows, drf_request)
+        response = _json_response(paginator.get_paginated_data(serializer.serialize(page)))
+        return add_rate_limit_headers(drf_request, add_validator_headers(response, etag, last_modified))
+
+    row = await serializer.get_rows(Sales.objects.filter(pk=pk)).afirst()
+    if row is None:
+        response = _json_response({
+            'message': 'object with given id not found.',
+            'success': False
+        }, status=HTTPStatus.NOT_FOUND)
+    else:
+        response = add_validator_headers(_json_response({
+            'data': serializer.to_representation(row),
+            'success': True
+        }), etag, last_modified)
+    return add_rate_limit_headers(drf_request, response)
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.9 on 2026-10-18 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0002_sales_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sales',
+            name='UpdatedAt',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='sales',
+            name='Version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def assign_existing_sales(apps, schema_editor):
+    """
+    Move rows created before Sales was tenant-scoped into the oldest
+    organization. If none exists yet, a "Default Organization" owned by the
+    first superuser (or first user) is created for them.
+    """
+    Sales = apps.get_model('common', 'Sales')
+    Organization = apps.get_model('organizations', 'Organization')
+    OrganizationMembership = apps.get_model('organizations', 'OrganizationMembership')
+    Role = apps.get_model('organizations', 'Role')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+
+    orphans = Sales.objects.filter(organization__isnull=True)
+    if not orphans.exists():
+        return
+
+    organization = Organization.objects.order_by('created_at').first()
+    if organization is None:
+        owner = User.objects.order_by('-is_superuser', 'pk').first()
+        if owner is None:
+            raise RuntimeError(
+                'Existing Sales records need an organization, but there are no users to own one. '
+                'Create a superuser and run the migration again.'
+            )
+        organization = Organization.objects.create(name='Default Organization', owner=owner)
+        role, created = Role.objects.get_or_create(
+            name='Owner',
+            is_system_role=True,
+            defaults={'description': 'System role: Owner'}
+        )
+        OrganizationMembership.objects.create(
+            organization=organization,
+            user=owner,
+            role=role,
+            status='active'
+        )
+    orphans.update(organization=organization)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('organizations', '0001_initial'),
+        ('common', '0003_sales_version'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='sales',
+            name='sales_purchase_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='sales',
+            name='sales_country_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='sales',
+            name='sales_currency_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='sales',
+            name='sales_price_idx',
+        ),
+        migrations.AddField(
+            model_name='sales',
+            name='organization',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='%(class)ss', to='organizations.organization'),
+        ),
+        migrations.RunPython(assign_existing_sales, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='sales',
+            name='organization',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='%(class)ss', to='organizations.organization'),
+        ),
+        migrations.AddIndex(
+            model_name='sales',
+            index=models.Index(fields=['organization', 'ID'], name='sales_org_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sales',
+            index=models.Index(fields=['organization', 'PurchaseDate'], name='sales_org_purchase_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sales',
+            index=models.Index(fields=['organization', 'Product'], name='sales_org_product_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sales',
+            index=models.Index(fields=['organization', 'Country'], name='sales_org_country_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sales',
+            index=models.Index(fields=['organization', 'Currency'], name='sales_org_currency_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sales',
+            index=models.Index(fields=['organization', 'Price'], name='sales_org_price_idx'),
+        ),
+    ]
@@ -6,6 +6,8 @@ from django.db import models
 ### ### Below code is Generated ### ###
 
 from django.db import models
+from apps.common.utils import bump_sales_data_version
+from apps.organizations.models import OrganizationModelMixin
 
 class RefundedChoices(models.TextChoices):
 	YES = 'YES', 'Yes'
@@ -15,7 +17,7 @@ class CurrencyChoices(models.TextChoices):
 	USD = 'USD', 'USD'
 	EUR = 'EUR', 'EUR'
 	
-class Sales(models.Model):
+class Sales(OrganizationModelMixin):
 	ID = models.AutoField(primary_key=True)
 	Product = models.TextField(blank=True, null=True)
 	BuyerEmail = models.EmailField(blank=True, null=True)
@@ -24,4 +26,30 @@ class Sales(models.Model):
 	Price = models.FloatField(blank=True, null=True)
 	Refunded = models.CharField(max_length=20, choices=RefundedChoices.choices, default=RefundedChoices.NO)
 	Currency = models.CharField(max_length=10, choices=CurrencyChoices.choices, default=CurrencyChoices.USD)
-	Quantity = models.IntegerField(blank=True, null=True)
\ No newline at end of file
+	Quantity = models.IntegerField(blank=True, null=True)
+	Version = models.PositiveIntegerField(default=1, editable=False)
+	UpdatedAt = models.DateTimeField(auto_now=True, null=True)
+
+	class Meta:
+		# Led by organization so tenant queries scan only that tenant's range
+		indexes = [
+			models.Index(fields=['organization', 'ID'], name='sales_org_id_idx'),
+			models.Index(fields=['organization', 'PurchaseDate'], name='sales_org_purchase_date_idx'),
+			models.Index(fields=['organization', 'Product'], name='sales_org_product_idx'),
+			models.Index(fields=['organization', 'Country'], name='sales_org_country_idx'),
+			models.Index(fields=['organization', 'Currency'], name='sales_org_currency_idx'),
+			models.Index(fields=['organization', 'Price'], name='sales_org_price_idx'),
+		]
+
+	def save(self, *args, **kwargs):
+		# Per-row version used for API ETags; the table-wide data version is bumped too
+		if not self._state.adding:
+			self.Version += 1
+		super().save(*args, **kwargs)
+		bump_sales_data_version(self.organization_id)
+
+	def delete(self, *args, **kwargs):
+		result = super().delete(*args, **kwargs)
+		bump_sales_data_version(self.organization_id)
+		return result
+
@@ -0,0 +1,40 @@
+import time
+from django.core.cache import cache
+from django.db import transaction
+
+SALES_DATA_VERSION_KEY = 'sales:data-version'
+
+
+def get_sales_data_version_key(organization_id=None):
+    if organization_id is None:
+        return SALES_DATA_VERSION_KEY
+    return f'{SALES_DATA_VERSION_KEY}:{organization_id}'
+
+
+def get_sales_data_version(organization_id=None):
+    """
+    Return the Sales data version of one organization (or of the whole table
+    when `organization_id` is None): the time (ns since epoch) of the last
+    write. If the key is missing (first use or evicted) it is reset to now, so
+    cached list responses are treated as stale rather than wrongly fresh.
+    """
+    key = get_sales_data_version_key(organization_id)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        cache.add(key, version, None)
+    return version
+
+
+def bump_sales_data_version(organization_id=None):
+    """
+    Mark the Sales data of an organization (and the table as a whole) as
+    changed. Call after any write, including bulk writes; inside a
+    transaction the bump happens on commit, so readers never pair the new
+    version with the old data.
+    """
+    def bump():
+        version = time.time_ns()
+        keys = {get_sales_data_version_key(), get_sales_data_version_key(organization_id)}
+        cache.set_many({key: version for key in keys}, None)
+    transaction.on_commit(bump)
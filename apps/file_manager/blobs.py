@@ -0,0 +1,98 @@
+import os
+import uuid
+import logging
+from django.conf import settings
+
+logger = logging.getLogger('file_manager.blobs')
+
+
+def get_blobs_root():
+    return os.path.join(settings.MEDIA_ROOT, '.blobs')
+
+
+def get_blob_path(sha256):
+    return os.path.join(get_blobs_root(), sha256[:2], sha256[2:4], sha256)
+
+
+def get_upload_temp_path():
+    """A new temporary path on the same filesystem as the user directories."""
+    temp_directory = os.path.join(settings.MEDIA_ROOT, '.uploads')
+    os.makedirs(temp_directory, exist_ok=True)
+    return os.path.join(temp_directory, f'{uuid.uuid4().hex}.tmp')
+
+
+def deduplicate_file(path, sha256):
+    """
+    Make `path` a hard link to the blob of its content, creating the blob
+    from it when the content is new. The blob's link count is the number of
+    user files referencing it (plus one for the blob itself).
+    """
+    blob_path = get_blob_path(sha256)
+    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+    for attempt in range(3):
+        try:
+            os.link(path, blob_path)
+            return blob_path
+        except FileExistsError:
+            pass
+        link_path = f'{path}.{uuid.uuid4().hex[:8]}.link'
+        try:
+            os.link(blob_path, link_path)
+        except FileNotFoundError:
+            # The blob lost its last reference meanwhile; create it again
+            continue
+        os.replace(link_path, path)
+        return blob_path
+    raise FileNotFoundError(blob_path)
+
+
+def store_file(temp_path, target_path, sha256):
+    """
+    Move a completely written temporary file to `target_path`.
+
+    With FILE_MANAGER_DEDUPLICATE the content is stored once under its
+    digest and `target_path` is a hard link to it, so repeated uploads of the
+    same file take no extra space. If the blob cannot be linked (e.g. the
+    filesystem has no hard links) the file is moved into place as it is,
+    without deduplication, and a warning is logged.
+    """
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    if settings.FILE_MANAGER_DEDUPLICATE:
+        try:
+            deduplicate_file(temp_path, sha256)
+        except OSError as e:
+            logger.warning(f"Cannot deduplicate {target_path}, storing it without deduplication: {e}")
+    os.replace(temp_path, target_path)
+
+
+def remove_stored_file(path, sha256=None):
+    """
+    Delete a user file. If it was the last reference to its blob, the blob
+    is deleted too.
+    """
+    stat = os.stat(path)
+    os.remove(path)
+    if not sha256 or stat.st_nlink < 2:
+        return
+    blob_path = get_blob_path(sha256)
+    try:
+        blob_stat = os.stat(blob_path)
+    except FileNotFoundError:
+        return
+    if blob_stat.st_ino == stat.st_ino and blob_stat.st_nlink == 1:
+        os.remove(blob_path)
+
+
+def collect_orphan_blobs():
+    """Delete blobs no user file links to anymore (e.g. files removed outside the app)."""
+    removed = 0
+    for root, directories, filenames in os.walk(get_blobs_root()):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            try:
+                if os.stat(path).st_nlink == 1:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
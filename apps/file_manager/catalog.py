@@ -0,0 +1,280 @@
+import io
+import os
+import csv
+import hashlib
+import logging
+import datetime
+import mimetypes
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from apps.organizations.utils import get_user_active_organization
+from .blobs import collect_orphan_blobs, deduplicate_file
+from .models import CsvProfile, FileEntry
+from .profiling import profile_csv_file
+from .utils import get_user_media_path
+
+logger = logging.getLogger('file_manager.catalog')
+
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+class _HashingReader(io.RawIOBase):
+    """Raw reader that feeds every byte read into `digest` (if any)."""
+
+    def __init__(self, file, digest):
+        self.file = file
+        self.digest = digest
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = self.file.readinto(buffer)
+        if count and self.digest is not None:
+            self.digest.update(memoryview(buffer)[:count])
+        return count
+
+
+def inspect_file(absolute_path, sha256=None):
+    """
+    Return the content metadata of a file: MIME type, SHA-256 and, for CSV
+    files, row and column counts. The file is read once; hashing is skipped
+    when `sha256` is already known, and then only CSV files are read at all.
+    """
+    mime_type = mimetypes.guess_type(absolute_path)[0] or 'application/octet-stream'
+    info = {'mime_type': mime_type, 'sha256': sha256, 'csv_rows': None, 'csv_columns': None}
+    is_csv = mime_type == 'text/csv'
+    if sha256 and not is_csv:
+        return info
+
+    digest = None if sha256 else hashlib.sha256()
+    with open(absolute_path, 'rb') as file:
+        reader = _HashingReader(file, digest)
+        if is_csv:
+            stream = io.BufferedReader(reader, READ_BLOCK_SIZE)
+            text = io.TextIOWrapper(stream, encoding='utf-8', errors='replace', newline='')
+            rows = columns = 0
+            try:
+                for row in csv.reader(text):
+                    if not rows:
+                        columns = len(row)
+                    rows += 1
+                info.update(csv_rows=rows, csv_columns=columns)
+            except csv.Error:
+                pass
+            text.detach()
+        if digest is not None:
+            # Hash whatever the CSV reader did not get to
+            buffer = bytearray(READ_BLOCK_SIZE)
+            while reader.readinto(buffer):
+                pass
+            info['sha256'] = digest.hexdigest()
+    return info
+
+
+def get_catalog_path(absolute_path):
+    return os.path.relpath(absolute_path, settings.MEDIA_ROOT).replace(os.sep, '/')
+
+
+def _entry_fields(user_id, absolute_path, stat, info):
+    user_root = get_user_media_path(user_id)
+    directory = os.path.relpath(os.path.dirname(absolute_path), user_root).replace(os.sep, '/')
+    return {
+        'user_id': user_id,
+        'directory': '' if directory == '.' else directory,
+        'name': os.path.basename(absolute_path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'modified': datetime.datetime.fromtimestamp(stat.st_mtime, tz=datetime.timezone.utc),
+        **info,
+    }
+
+
+def catalog_file(user_id, absolute_path, organization_id=None, sha256=None):
+    """
+    Create or refresh the catalog entry of one file in the user's directory.
+    A file whose size and mtime match its entry is not read again. Returns
+    the entry, or None if the file no longer exists.
+    """
+    path = get_catalog_path(absolute_path)
+    try:
+        stat = os.stat(absolute_path)
+    except FileNotFoundError:
+        FileEntry.objects.filter(path=path).delete()
+        return None
+
+    entry = FileEntry.objects.filter(path=path).first()
+    if entry and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+        return entry
+
+    fields = _entry_fields(user_id, absolute_path, stat, inspect_file(absolute_path, sha256))
+    if organization_id is not None or entry is None:
+        fields['organization_id'] = organization_id
+    entry, created = FileEntry.objects.update_or_create(path=path, defaults=fields)
+    if entry.mime_type == 'text/csv':
+        request_csv_profile(entry.sha256)
+    return entry
+
+
+def remove_from_catalog(absolute_path):
+    FileEntry.objects.filter(path=get_catalog_path(absolute_path)).delete()
+
+
+def scan_user_files(user):
+    """
+    Bring the catalog of one user in line with their directory: new and
+    changed files (by size and mtime) are inspected, entries of deleted files
+    are removed. Unchanged files cost one `stat()` and no queries. With
+    FILE_MANAGER_DEDUPLICATE, new files are also moved into blob storage.
+    """
+    known = {
+        path: (pk, size, mtime_ns)
+        for pk, path, size, mtime_ns in FileEntry.objects.filter(user=user).values_list('id', 'path', 'size', 'mtime_ns')
+    }
+    organization_id = False
+    created = []
+    csv_hashes = set()
+    counts = {'created': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
+
+    for root, directories, filenames in os.walk(get_user_media_path(user.id)):
+        for filename in filenames:
+            absolute_path = os.path.join(root, filename)
+            path = get_catalog_path(absolute_path)
+            try:
+                stat = os.stat(absolute_path)
+            except OSError:
+                continue
+            current = known.pop(path, None)
+            if current and current[1] == stat.st_size and current[2] == stat.st_mtime_ns:
+                counts['unchanged'] += 1
+                continue
+            try:
+                info = inspect_file(absolute_path)
+            except OSError:
+                continue
+            if settings.FILE_MANAGER_DEDUPLICATE and stat.st_nlink == 1:
+                # Files stored before deduplication was enabled
+                try:
+                    deduplicate_file(absolute_path, info['sha256'])
+                    stat = os.stat(absolute_path)
+                except OSError as e:
+                    logger.warning(f"Cannot deduplicate {absolute_path}: {e}")
+            fields = _entry_fields(user.id, absolute_path, stat, info)
+            if fields['mime_type'] == 'text/csv':
+                csv_hashes.add(fields['sha256'])
+            if current:
+                FileEntry.objects.filter(pk=current[0]).update(scanned_at=timezone.now(), **fields)
+                counts['updated'] += 1
+                continue
+            if organization_id is False:
+                organization_id = get_user_active_organization(user)
+            created.append(FileEntry(path=path, organization_id=organization_id, **fields))
+            if len(created) >= 500:
+                counts['created'] += len(FileEntry.objects.bulk_create(created, ignore_conflicts=True))
+                created = []
+
+    if created:
+        counts['created'] += len(FileEntry.objects.bulk_create(created, ignore_conflicts=True))
+    if known:
+        counts['deleted'], _ = FileEntry.objects.filter(id__in=[pk for pk, size, mtime_ns in known.values()]).delete()
+    for sha256 in csv_hashes:
+        request_csv_profile(sha256)
+    return counts
+
+
+def scan_catalog(user_id=None):
+    """Scan the directory of one user, or of every user with one under MEDIA_ROOT."""
+    users = get_user_model().objects.all()
+    if user_id is not None:
+        users = users.filter(pk=user_id)
+    else:
+        try:
+            ids = [name for name in os.listdir(settings.MEDIA_ROOT) if name.isdigit()]
+        except FileNotFoundError:
+            ids = []
+        users = users.filter(pk__in=ids)
+
+    results = {}
+    for user in users:
+        results[user.pk] = scan_user_files(user)
+    if user_id is None and settings.FILE_MANAGER_DEDUPLICATE:
+        results['orphan_blobs'] = collect_orphan_blobs()
+    return results
+
+
+def _get_user_scan_key(user_id):
+    return f'file_manager:scan:{user_id}'
+
+
+def request_user_scan(user_id):
+    """
+    Queue a scan of a user's directory, for a user with no catalog entries
+    yet, unless one was queued or finished within the last
+    FILE_MANAGER_CATALOG_SCAN_INTERVAL (after which the periodic scan covers
+    it anyway). Returns True while the scan is pending.
+    """
+    try:
+        with os.scandir(get_user_media_path(user_id)) as entries:
+            if next(entries, None) is None:
+                return False
+    except FileNotFoundError:
+        return False
+    if cache.add(_get_user_scan_key(user_id), 'pending', settings.FILE_MANAGER_CATALOG_SCAN_INTERVAL):
+        from .tasks import scan_file_catalog
+        transaction.on_commit(lambda: scan_file_catalog.delay(user_id))
+    return is_user_scan_pending(user_id)
+
+
+def is_user_scan_pending(user_id):
+    return cache.get(_get_user_scan_key(user_id)) == 'pending'
+
+
+def finish_user_scan(user_id):
+    # Kept as "done" rather than deleted, so a directory with nothing to
+    # catalogue is not queued again on every page view
+    cache.set(_get_user_scan_key(user_id), 'done', settings.FILE_MANAGER_CATALOG_SCAN_INTERVAL)
+
+
+def request_csv_profile(sha256):
+    """
+    Queue the profiling of a CSV content unless it already has a profile.
+    A profile still pending after the task time limit (its task was lost)
+    is queued again.
+    """
+    profile, created = CsvProfile.objects.get_or_create(sha256=sha256)
+    stale = profile.status == 'pending' and profile.updated_at < timezone.now() - datetime.timedelta(hours=2)
+    if created or stale:
+        from .tasks import profile_csv
+        if stale:
+            profile.save(update_fields=['updated_at'])
+        transaction.on_commit(lambda: profile_csv.delay(sha256))
+    return profile
+
+
+def run_csv_profile(sha256):
+    """Profile the CSV content `sha256` from the first catalogued file that has it."""
+    profile, created = CsvProfile.objects.get_or_create(sha256=sha256)
+    if profile.status == 'complete':
+        return profile.rows
+
+    entry = next((entry for entry in FileEntry.objects.filter(sha256=sha256) if os.path.isfile(entry.absolute_path)), None)
+    if entry is None:
+        profile.status, profile.error = 'failed', 'No file with this content exists anymore.'
+        profile.save(update_fields=['status', 'error', 'updated_at'])
+        return None
+
+    profile.status = 'running'
+    profile.save(update_fields=['status', 'updated_at'])
+    try:
+        profile.rows, profile.truncated, profile.columns = profile_csv_file(
+            entry.absolute_path, settings.FILE_MANAGER_PROFILE_MAX_ROWS
+        )
+        profile.status, profile.error = 'complete', ''
+    except (OSError, csv.Error) as e:
+        profile.status, profile.error = 'failed', str(e)
+    profile.save()
+    return profile.rows
@@ -0,0 +1,188 @@
+import re
+import csv
+import math
+import datetime
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import connection, models, transaction
+
+from apps.common.models import Sales
+from apps.common.utils import bump_sales_data_version
+
+# Sales fields a CSV column can be mapped to, in form order
+SALES_IMPORT_FIELDS = ['Product', 'BuyerEmail', 'PurchaseDate', 'Country', 'Price', 'Refunded', 'Currency', 'Quantity']
+MAX_IMPORT_ERRORS = 20
+BOOLEAN_CHOICES = {'true': 'YES', '1': 'YES', 'y': 'YES', 'false': 'NO', '0': 'NO', 'n': 'NO'}
+
+
+def _normalize(name):
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+
+def guess_sales_mapping(header):
+    """Map each Sales field to the CSV column of the same name (ignoring case and punctuation), if any."""
+    columns = {_normalize(name): index for index, name in reversed(list(enumerate(header)))}
+    return {
+        field: columns[_normalize(field)]
+        for field in SALES_IMPORT_FIELDS if _normalize(field) in columns
+    }
+
+
+def _parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        return datetime.datetime.fromisoformat(value).date()
+
+
+def _parse_float(value):
+    number = float(value)
+    if math.isnan(number) or math.isinf(number):
+        raise ValueError(f'{value!r} is not a finite number')
+    return number
+
+
+def _parse_integer(value):
+    try:
+        return int(value)
+    except ValueError:
+        number = float(value)
+        if not number.is_integer():
+            raise
+        return int(number)
+
+
+def _email_parser(field):
+    def parse(value):
+        if len(value) > field.max_length:
+            raise ValueError(f'longer than {field.max_length} characters')
+        validate_email(value)
+        return value
+    return parse
+
+
+def _choice_parser(field):
+    choices = {}
+    for value, label in field.choices:
+        choices[value.lower()] = choices[label.lower()] = value
+    if set(choices.values()) == {'YES', 'NO'}:
+        choices.update(BOOLEAN_CHOICES)
+
+    def parse(value):
+        try:
+            return choices[value.lower()]
+        except KeyError:
+            raise ValueError(f'{value!r} is not one of {", ".join(value for value, label in field.choices)}')
+    return parse
+
+
+def get_field_parser(field):
+    """Function converting one non-empty CSV value to the Python value of a Sales field."""
+    if field.choices:
+        return _choice_parser(field)
+    if isinstance(field, models.EmailField):
+        return _email_parser(field)
+    if isinstance(field, models.DateField):
+        return _parse_date
+    if isinstance(field, models.FloatField):
+        return _parse_float
+    if isinstance(field, models.IntegerField):
+        return _parse_integer
+    return str
+
+
+def get_row_parser(mapping):
+    """
+    Build the function turning one CSV row into Sales field values. Empty
+    cells are left out, so the field gets its default (or NULL). Raises
+    ValueError, naming the field, for a value of the wrong type.
+    """
+    parsers = [
+        (name, index, get_field_parser(Sales._meta.get_field(name)))
+        for name, index in mapping.items()
+    ]
+
+    def parse(row):
+        values = {}
+        for name, index, parser in parsers:
+            value = row[index].strip() if index < len(row) else ''
+            if value:
+                try:
+                    values[name] = parser(value)
+                except (ValueError, ValidationError) as e:
+                    message = '; '.join(e.messages) if isinstance(e, ValidationError) else str(e)
+                    raise ValueError(f'{name}: {message}')
+        return values
+    return parse
+
+
+def analyze_sales_table():
+    """Refresh the planner statistics of the Sales table after a large load."""
+    if connection.vendor in ('postgresql', 'sqlite'):
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(Sales._meta.db_table)}')
+
+
+def run_csv_import(csv_import):
+    """
+    Load the CSV file of a CsvImport into the Sales table of its
+    organization. The file is streamed and inserted in batches of
+    FILE_MANAGER_IMPORT_BATCH_SIZE rows, each batch committed with one
+    `bulk_create`, so memory use does not grow with the file and progress is
+    visible while it runs. Rows with a value of the wrong type are skipped
+    and the first MAX_IMPORT_ERRORS of them recorded.
+    """
+    parse = get_row_parser(csv_import.mapping)
+    batch_size = settings.FILE_MANAGER_IMPORT_BATCH_SIZE
+    csv_import.status = 'running'
+    csv_import.rows_imported = csv_import.rows_skipped = 0
+    csv_import.errors = []
+    csv_import.save()
+
+    def flush(batch):
+        with transaction.atomic():
+            Sales.unfiltered_objects.bulk_create(batch)
+        csv_import.rows_imported += len(batch)
+        csv_import.save(update_fields=['rows_imported', 'rows_skipped', 'errors', 'updated_at'])
+
+    try:
+        with open(csv_import.absolute_path, 'r', newline='', encoding='utf-8', errors='replace') as file:
+            reader = csv.reader(file)
+            if csv_import.skip_header:
+                next(reader, None)
+            batch = []
+            for row in reader:
+                if not any(row):
+                    continue
+                try:
+                    values = parse(row)
+                except ValueError as e:
+                    csv_import.rows_skipped += 1
+                    if len(csv_import.errors) < MAX_IMPORT_ERRORS:
+                        csv_import.errors.append(f'Line {reader.line_num}: {e}')
+                    continue
+                batch.append(Sales(organization_id=csv_import.organization_id, **values))
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    batch = []
+            if batch:
+                flush(batch)
+        if csv_import.rows_imported:
+            analyze_sales_table()
+        csv_import.status = 'complete'
+    except (OSError, csv.Error) as e:
+        csv_import.status = 'failed'
+        csv_import.errors.append(str(e))
+    except Exception as e:
+        # Anything else (e.g. a database error) is re-raised for the task's
+        # log, but never leaves the import "running" for the UI to poll
+        csv_import.status = 'failed'
+        csv_import.errors.append(f'{e.__class__.__name__}: {e}')
+        csv_import.save()
+        raise
+    finally:
+        if csv_import.rows_imported:
+            bump_sales_data_version(csv_import.organization_id)
+    csv_import.save()
+    return csv_import.rows_imported
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.9 on 2026-10-18 21:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('file_manager', '0002_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='fileinfo',
+            name='path',
+            field=models.URLField(db_index=True),
+        ),
+    ]
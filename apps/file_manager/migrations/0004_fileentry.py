@@ -0,0 +1,39 @@
+# Generated by Django 4.2.9 on 2026-10-18 21:29
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('file_manager', '0003_fileinfo_path_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=1024, unique=True)),
+                ('directory', models.CharField(blank=True, max_length=1024)),
+                ('name', models.CharField(max_length=255)),
+                ('size', models.BigIntegerField()),
+                ('mtime_ns', models.BigIntegerField()),
+                ('modified', models.DateTimeField()),
+                ('sha256', models.CharField(db_index=True, max_length=64)),
+                ('mime_type', models.CharField(blank=True, max_length=255)),
+                ('csv_rows', models.PositiveIntegerField(blank=True, null=True)),
+                ('csv_columns', models.PositiveIntegerField(blank=True, null=True)),
+                ('scanned_at', models.DateTimeField(auto_now=True)),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='file_entries', to='organizations.organization')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='file_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'directory', 'name'], name='file_entry_listing_idx'), models.Index(fields=['user', 'name'], name='file_entry_name_idx'), models.Index(fields=['user', 'size'], name='file_entry_size_idx'), models.Index(fields=['user', 'modified'], name='file_entry_modified_idx')],
+            },
+        ),
+    ]
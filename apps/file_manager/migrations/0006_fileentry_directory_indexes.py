@@ -0,0 +1,21 @@
+# Generated by Django 4.2.9 on 2026-10-18 21:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('file_manager', '0005_csvprofile'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fileentry',
+            index=models.Index(fields=['user', 'directory', 'size'], name='file_entry_dir_size_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fileentry',
+            index=models.Index(fields=['user', 'directory', 'modified'], name='file_entry_dir_modified_idx'),
+        ),
+    ]
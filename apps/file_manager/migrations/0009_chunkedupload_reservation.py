@@ -0,0 +1,32 @@
+# Generated by Django 4.2.9 on 2026-10-18 21:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def reserve_existing_uploads(apps, schema_editor):
+    # Uploads in progress were charged their whole size
+    ChunkedUpload = apps.get_model('file_manager', 'ChunkedUpload')
+    ChunkedUpload.objects.filter(status='uploading').update(reserved=models.F('size'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+        ('file_manager', '0008_csvimport'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chunkedupload',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='chunked_uploads', to='organizations.organization'),
+        ),
+        migrations.AddField(
+            model_name='chunkedupload',
+            name='reserved',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(reserve_existing_uploads, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,215 @@
+import os
+import uuid
+from django.conf import settings
 from django.db import models
 
 # Create your models here.
 
 
 class FileInfo(models.Model):
-    path = models.URLField()
+    path = models.URLField(db_index=True)
     info = models.CharField(max_length=255)
 
     def __str__(self):
-        return self.path
\ No newline at end of file
+        return self.path
+
+
+class FileEntry(models.Model):
+    """
+    Catalog row for one file under MEDIA_ROOT/<user id>/. Kept current by the
+    upload and delete views and by the `scan_file_catalog` task, so listings,
+    sorting and search are indexed queries instead of directory walks.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='file_entries'
+    )
+    organization = models.ForeignKey(
+        'organizations.Organization',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='file_entries'
+    )
+    path = models.CharField(max_length=1024, unique=True)  # relative to MEDIA_ROOT, e.g. "1/reports/q1.csv"
+    directory = models.CharField(max_length=1024, blank=True)  # relative to the user's directory
+    name = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    mtime_ns = models.BigIntegerField()  # change detection, compared with os.stat()
+    modified = models.DateTimeField()
+    sha256 = models.CharField(max_length=64, db_index=True)
+    mime_type = models.CharField(max_length=255, blank=True)
+    csv_rows = models.PositiveIntegerField(null=True, blank=True)  # including the header row
+    csv_columns = models.PositiveIntegerField(null=True, blank=True)
+    scanned_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'directory', 'name'], name='file_entry_listing_idx'),
+            models.Index(fields=['user', 'directory', 'size'], name='file_entry_dir_size_idx'),
+            models.Index(fields=['user', 'directory', 'modified'], name='file_entry_dir_modified_idx'),
+            models.Index(fields=['user', 'name'], name='file_entry_name_idx'),
+            models.Index(fields=['user', 'size'], name='file_entry_size_idx'),
+            models.Index(fields=['user', 'modified'], name='file_entry_modified_idx'),
+        ]
+
+    def __str__(self):
+        return self.path
+
+    @property
+    def absolute_path(self):
+        return os.path.join(settings.MEDIA_ROOT, self.path)
+
+
+class CsvProfile(models.Model):
+    """
+    Column statistics of a CSV file, computed once per content (SHA-256) by
+    the `profile_csv` task and shared by every file with that content.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('complete', 'Complete'),
+        ('failed', 'Failed'),
+    )
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    rows = models.BigIntegerField(null=True, blank=True)
+    truncated = models.BooleanField(default=False)  # stopped at FILE_MANAGER_PROFILE_MAX_ROWS
+    columns = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.sha256} ({self.status})'
+
+
+class CsvImport(models.Model):
+    """
+    One load of a catalogued CSV file into the `Sales` table, run in the
+    background by the `import_csv` task. `mapping` maps Sales field names to
+    CSV column indexes.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('complete', 'Complete'),
+        ('failed', 'Failed'),
+    )
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='csv_imports')
+    organization = models.ForeignKey('organizations.Organization', on_delete=models.CASCADE, related_name='csv_imports')
+    path = models.CharField(max_length=1024)  # relative to MEDIA_ROOT, like FileEntry.path
+    mapping = models.JSONField(default=dict)
+    skip_header = models.BooleanField(default=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    rows_imported = models.BigIntegerField(default=0)
+    rows_skipped = models.BigIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)  # the first few rejected rows
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.path} ({self.status})'
+
+    @property
+    def absolute_path(self):
+        return os.path.join(settings.MEDIA_ROOT, self.path)
+
+
+class StorageUsage(models.Model):
+    """
+    Bytes stored by one user or one organization. Kept current
+    incrementally by `apps.file_manager.quotas.charge_storage` and
+    corrected by `reconcile_storage_usage`.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='storage_usage'
+    )
+    organization = models.OneToOneField(
+        'organizations.Organization',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='storage_usage'
+    )
+    used = models.BigIntegerField(default=0)
+    quota = models.BigIntegerField(null=True, blank=True)  # bytes; None uses the STORAGE_QUOTA_* default
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(user__isnull=True) ^ models.Q(organization__isnull=True),
+                name='storage_usage_single_owner'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id or self.organization_id}: {self.used}'
+
+    def get_quota(self):
+        """The quota in bytes, or None for unlimited."""
+        if self.quota is not None:
+            return self.quota or None
+        if self.user_id:
+            return settings.STORAGE_QUOTA_USER or None
+        return settings.STORAGE_QUOTA_ORGANIZATION or None
+
+
+class ChunkedUpload(models.Model):
+    """
+    State of a resumable upload. Chunks are written straight into a part file
+    at `offset`; once `offset` reaches `size` the file is checked and moved
+    into the user's directory. `reserved` bytes are charged to the user and
+    `organization` when the upload starts and released if it fails, is
+    cancelled or expires.
+    """
+    STATUS_CHOICES = (
+        ('uploading', 'Uploading'),
+        ('complete', 'Complete'),
+        ('failed', 'Failed'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='chunked_uploads'
+    )
+    organization = models.ForeignKey(
+        'organizations.Organization',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='chunked_uploads'
+    )
+    directory = models.CharField(max_length=1024, blank=True)
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    reserved = models.BigIntegerField(default=0)  # size less the size of the file it replaces
+    checksum = models.CharField(max_length=64, blank=True)  # expected SHA-256, if the client sent one
+    sha256 = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='uploading')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.filename} ({self.offset}/{self.size})'
+
+    @property
+    def part_path(self):
+        # Under MEDIA_ROOT so completing the upload is a rename, not a copy
+        return os.path.join(settings.MEDIA_ROOT, '.uploads', f'{self.id}.part')
+
+    @property
+    def target_path(self):
+        return os.path.join(settings.MEDIA_ROOT, str(self.user_id), self.directory, self.filename)
@@ -0,0 +1,184 @@
+import csv
+import math
+import random
+import datetime
+
+NULL_VALUES = {'', 'null', 'none', 'na', 'n/a', 'nan', '-'}
+BOOLEAN_VALUES = {'true', 'false', 'yes', 'no'}
+SAMPLE_SIZE = 10000    # values kept per numeric column for its histogram
+DISTINCT_K = 1024      # hashes kept per column for the distinct estimate
+HISTOGRAM_BINS = 10
+
+
+def infer_type(value, current=None):
+    """Most specific type of one non-null CSV value (`current` is tried first)."""
+    if current in ('integer', 'float'):
+        try:
+            float(value)
+        except ValueError:
+            pass
+        else:
+            return 'float' if current == 'float' or not value.lstrip('+-').isdigit() else 'integer'
+    try:
+        int(value)
+        return 'integer'
+    except ValueError:
+        pass
+    try:
+        float(value)
+        return 'float'
+    except ValueError:
+        pass
+    if value.lower() in BOOLEAN_VALUES:
+        return 'boolean'
+    try:
+        datetime.datetime.fromisoformat(value)
+        return 'datetime'
+    except ValueError:
+        return 'string'
+
+
+def merge_types(current, new):
+    if current is None or current == new:
+        return new
+    if {current, new} == {'integer', 'float'}:
+        return 'float'
+    return 'string'
+
+
+class ColumnProfile:
+    """
+    Single-pass statistics of one column. Memory is bounded: distinct values
+    are estimated from the K smallest value hashes, and histograms are built
+    from a reservoir sample of the numeric values.
+    """
+
+    def __init__(self, name, seed=0):
+        self.name = name
+        self.type = None
+        self.count = 0
+        self.nulls = 0
+        self.min_text = self.max_text = None
+        self.numbers = 0
+        self.total = 0.0
+        self.min_number = self.max_number = None
+        self.sample = []
+        self.hashes = set()
+        self.max_hash = None
+        self.random = random.Random(seed)
+
+    def add(self, value):
+        self.count += 1
+        value = value.strip()
+        if value.lower() in NULL_VALUES:
+            self.nulls += 1
+            return
+
+        self._add_hash(value)
+        if self.min_text is None or value < self.min_text:
+            self.min_text = value
+        if self.max_text is None or value > self.max_text:
+            self.max_text = value
+        if self.type == 'string':
+            # Nothing left to infer, and numeric stats are not reported
+            return
+        kind = infer_type(value, self.type)
+        self.type = merge_types(self.type, kind)
+        if kind in ('integer', 'float'):
+            self._add_number(float(value))
+
+    def _add_number(self, number):
+        if math.isnan(number) or math.isinf(number):
+            return
+        self.numbers += 1
+        self.total += number
+        if self.min_number is None or number < self.min_number:
+            self.min_number = number
+        if self.max_number is None or number > self.max_number:
+            self.max_number = number
+        if len(self.sample) < SAMPLE_SIZE:
+            self.sample.append(number)
+        else:
+            index = self.random.randrange(self.numbers)
+            if index < SAMPLE_SIZE:
+                self.sample[index] = number
+
+    def _add_hash(self, value):
+        # str hashes are stable within a process, which is all one profile needs
+        value_hash = hash(value) & 0xFFFFFFFFFFFFFFFF
+        if value_hash in self.hashes:
+            return
+        if len(self.hashes) < DISTINCT_K:
+            self.hashes.add(value_hash)
+            self.max_hash = None
+        else:
+            if self.max_hash is None:
+                self.max_hash = max(self.hashes)
+            if value_hash < self.max_hash:
+                self.hashes.remove(self.max_hash)
+                self.hashes.add(value_hash)
+                self.max_hash = max(self.hashes)
+
+    def distinct(self):
+        """Exact below DISTINCT_K values, else the K-minimum-values estimate."""
+        if len(self.hashes) < DISTINCT_K:
+            return len(self.hashes)
+        return int((DISTINCT_K - 1) * 2 ** 64 / max(self.hashes))
+
+    def histogram(self):
+        if not self.sample or self.min_number == self.max_number:
+            return None
+        width = (self.max_number - self.min_number) / HISTOGRAM_BINS
+        counts = [0] * HISTOGRAM_BINS
+        for number in self.sample:
+            counts[min(int((number - self.min_number) / width), HISTOGRAM_BINS - 1)] += 1
+        scale = self.numbers / len(self.sample)
+        return {
+            'edges': [self.min_number + width * i for i in range(HISTOGRAM_BINS + 1)],
+            'counts': [round(count * scale) for count in counts],
+        }
+
+    def as_dict(self):
+        numeric = self.type in ('integer', 'float')
+        profile = {
+            'name': self.name,
+            'type': self.type or 'empty',
+            'count': self.count,
+            'nulls': self.nulls,
+            'distinct': self.distinct(),
+            'min': self.min_number if numeric else self.min_text,
+            'max': self.max_number if numeric else self.max_text,
+            'mean': self.total / self.numbers if numeric and self.numbers else None,
+            'histogram': self.histogram() if numeric else None,
+        }
+        if numeric and self.type == 'integer' and profile['min'] is not None:
+            profile['min'], profile['max'] = int(profile['min']), int(profile['max'])
+        return profile
+
+
+def profile_csv_file(path, max_rows=None):
+    """
+    Stream a CSV file once and return `(rows, truncated, columns)`, where
+    `columns` holds one `ColumnProfile.as_dict()` per header column. The first
+    row is taken as the header; rows are data rows only.
+    """
+    with open(path, 'r', newline='', encoding='utf-8', errors='replace') as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return 0, False, []
+        columns = [ColumnProfile(name or f'column_{index + 1}', seed=index) for index, name in enumerate(header)]
+        rows = 0
+        truncated = False
+        for row in reader:
+            if max_rows and rows >= max_rows:
+                truncated = True
+                break
+            rows += 1
+            for column, value in zip(columns, row):
+                column.add(value)
+            # Short rows: the missing cells are nulls
+            for column in columns[len(row):]:
+                column.count += 1
+                column.nulls += 1
+    return rows, truncated, [column.as_dict() for column in columns]
@@ -0,0 +1,172 @@
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Greatest
+
+from .models import ChunkedUpload, FileEntry, StorageUsage
+
+
+class QuotaExceeded(Exception):
+    def __init__(self, usage, size):
+        self.usage = usage
+        self.size = size
+        owner = 'organization' if usage.organization_id else 'user'
+        super().__init__(
+            f'This {size} byte upload exceeds the {owner} storage quota '
+            f'({usage.used} of {usage.get_quota()} bytes used).'
+        )
+
+
+def get_storage_usages(user_id=None, organization_id=None):
+    """The StorageUsage rows of a user and/or organization, created on first use."""
+    usages = []
+    if user_id is not None:
+        usages.append(StorageUsage.objects.get_or_create(user_id=user_id)[0])
+    if organization_id is not None:
+        usages.append(StorageUsage.objects.get_or_create(organization_id=organization_id)[0])
+    return usages
+
+
+class QuotaUploadHandler(FileUploadHandler):
+    """
+    Upload handler that stops a multipart upload as soon as the file bytes
+    received would exceed the storage quota of the user or organization.
+    Install it first (before the request body is read, so with `csrf_exempt`
+    and `csrf_protect` around the view) so no other handler stores more than
+    the quota allows. The rest of the body is read and discarded, not
+    stored; `exceeded` is then the QuotaExceeded error.
+
+    `get_replaced_size(file_name)`, if given, is the most an uploaded file
+    of that name can free by replacing an existing one. It only loosens this
+    early check; the view still charges the exact difference.
+    """
+
+    def __init__(self, request, user_id, organization_id, get_replaced_size=None):
+        super().__init__(request)
+        self.usages = [usage for usage in get_storage_usages(user_id, organization_id) if usage.get_quota() is not None]
+        self.get_replaced_size = get_replaced_size
+        self.body_length = None
+        self.received = 0
+        self.replaced = 0
+        self.exceeded = None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # Only to report the size of the whole upload
+        self.body_length = content_length
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        if self.get_replaced_size and self.usages:
+            self.replaced += self.get_replaced_size(file_name)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        for usage in self.usages:
+            if usage.used - self.replaced + self.received > usage.get_quota():
+                self.exceeded = QuotaExceeded(usage, max(self.received, self.body_length or 0))
+                raise StopUpload(connection_reset=False)
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+def charge_storage(user_id, organization_id, size, enforce=True):
+    """
+    Add `size` bytes (negative to release) to the usage of a user and their
+    organization. Each counter is changed by a single conditional UPDATE, so
+    concurrent uploads cannot both pass the quota; if either counter would
+    exceed its quota neither is changed and QuotaExceeded is raised.
+    """
+    if not size:
+        return
+    with transaction.atomic():
+        for usage in get_storage_usages(user_id, organization_id):
+            usages = StorageUsage.objects.filter(pk=usage.pk)
+            quota = usage.get_quota()
+            if enforce and size > 0 and quota is not None:
+                usages = usages.filter(used__lte=quota - size)
+            if not usages.update(used=Greatest(F('used') + size, 0)):
+                usage.refresh_from_db()
+                raise QuotaExceeded(usage, size)
+
+
+def release_storage(user_id, organization_id, size):
+    charge_storage(user_id, organization_id, -size, enforce=False)
+
+
+def _get_file_size(field_file):
+    try:
+        return field_file.size
+    except (OSError, ValueError):
+        return 0
+
+
+def get_stored_file_name(instance, field_name, update_fields=None):
+    """
+    The file name a FileField of `instance` has in the database, for a
+    pre_save receiver to pass on to `charge_file_change`. None for a new
+    instance; the current name for a save that does not write the field.
+    """
+    if update_fields is not None and field_name not in update_fields:
+        return getattr(instance, field_name).name
+    if instance.pk is None:
+        return None
+    return type(instance)._base_manager.filter(pk=instance.pk).values_list(field_name, flat=True).first()
+
+
+def charge_file_change(field_file, stored_name, user_id=None, organization_id=None):
+    """
+    Charge the owner of a FileField (the one reconcile_storage_usage counts
+    it for) the size of its saved file less that of the file it replaced,
+    which is no longer counted even though it stays in storage.
+    """
+    if (stored_name or '') == (field_file.name or ''):
+        return
+    replaced_size = 0
+    if stored_name:
+        try:
+            replaced_size = field_file.storage.size(stored_name)
+        except (OSError, NotImplementedError):
+            pass
+    charge_storage(user_id, organization_id, _get_file_size(field_file) - replaced_size, enforce=False)
+
+
+def release_file(field_file, user_id=None, organization_id=None):
+    """Release the size of a FileField's file, e.g. when its instance is deleted."""
+    release_storage(user_id, organization_id, _get_file_size(field_file))
+
+
+def reconcile_storage_usage():
+    """
+    Recompute every counter from the file catalog, the reservations of
+    unfinished resumable uploads (made when they start) and the current
+    avatars and organization logos. Corrects drift from files changed
+    outside the application.
+    """
+    from apps.users.models import Profile
+    from apps.organizations.models import Organization
+
+    users = {}
+    organizations = {}
+    for user_id, total in FileEntry.objects.values_list('user').annotate(total=Sum('size')):
+        users[user_id] = users.get(user_id, 0) + total
+    for organization_id, total in FileEntry.objects.exclude(organization=None).values_list('organization').annotate(total=Sum('size')):
+        organizations[organization_id] = organizations.get(organization_id, 0) + total
+    uploading = ChunkedUpload.objects.filter(status='uploading')
+    for user_id, total in uploading.values_list('user').annotate(total=Sum('reserved')):
+        users[user_id] = users.get(user_id, 0) + total
+    for organization_id, total in uploading.exclude(organization=None).values_list('organization').annotate(total=Sum('reserved')):
+        organizations[organization_id] = organizations.get(organization_id, 0) + total
+
+    for profile in Profile.objects.exclude(avatar='').exclude(avatar=None).only('user_id', 'avatar'):
+        users[profile.user_id] = users.get(profile.user_id, 0) + _get_file_size(profile.avatar)
+    for organization in Organization.objects.exclude(logo='').exclude(logo=None).only('id', 'logo'):
+        organizations[organization.id] = organizations.get(organization.id, 0) + _get_file_size(organization.logo)
+
+    StorageUsage.objects.exclude(user_id__in=users).exclude(organization_id__in=organizations).update(used=0)
+    for user_id, total in users.items():
+        StorageUsage.objects.update_or_create(user_id=user_id, defaults={'used': total})
+    for organization_id, total in organizations.items():
+        StorageUsage.objects.update_or_create(organization_id=organization_id, defaults={'used': total})
+    return {'users': len(users), 'organizations': len(organizations)}
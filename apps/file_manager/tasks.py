@@ -0,0 +1,48 @@
+from apps.tasks.celery import app
+from .catalog import finish_user_scan, run_csv_profile, scan_catalog
+from .ingest import run_csv_import
+from .models import CsvImport
+from .quotas import reconcile_storage_usage
+from .uploads import expire_uploads
+
+
+@app.task
+def scan_file_catalog(user_id=None):
+    """
+    Sync the file catalog with MEDIA_ROOT (or one user's directory); only new
+    and changed files are read. A full scan then reconciles the storage
+    usage counters with the catalog. Scheduled by CELERY_BEAT_SCHEDULE.
+    """
+    try:
+        results = scan_catalog(user_id)
+    finally:
+        if user_id is not None:
+            finish_user_scan(user_id)
+    if user_id is None:
+        results['storage_usage'] = reconcile_storage_usage()
+    return results
+
+
+@app.task
+def expire_chunked_uploads():
+    """
+    Fail resumable uploads abandoned for FILE_MANAGER_UPLOAD_EXPIRY seconds,
+    deleting their part files and releasing their reserved storage.
+    Scheduled by CELERY_BEAT_SCHEDULE.
+    """
+    return expire_uploads()
+
+
+@app.task(time_limit=2 * 60 * 60)
+def profile_csv(sha256):
+    """Compute the CsvProfile of a CSV content from any catalogued file that has it."""
+    return run_csv_profile(sha256)
+
+
+@app.task(time_limit=2 * 60 * 60)
+def import_csv(import_id):
+    """Load a CsvImport into the Sales table."""
+    csv_import = CsvImport.objects.filter(pk=import_id, status='pending').first()
+    if csv_import is None:
+        return None
+    return run_csv_import(csv_import)
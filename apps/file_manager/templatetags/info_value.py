@@ -5,8 +5,4 @@ register = template.Library()
 
 @register.filter
 def info_value(path):
-    file_info = FileInfo.objects.filter(path=path)
-    if file_info.exists():
-        return file_info.first().info
-    else:
-        return ""
+    return FileInfo.objects.filter(path=path).values_list('info', flat=True).first() or ""
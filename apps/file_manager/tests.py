@@ -1,3 +1,59 @@
-from django.test import TestCase
+import json
+import shutil
+import datetime
+import tempfile
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
 
-# Create your tests here.
+from .models import ChunkedUpload
+from .uploads import expire_uploads
+
+
+class ChunkedUploadExpiryTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = get_user_model().objects.create_user('uploader', password='password')
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse('create_upload'), json.dumps({'filename': 'data.bin', 'size': 8}), content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.url = response.json()['data']['url']
+        self.upload = ChunkedUpload.objects.get(user=self.user)
+
+    def age_upload(self):
+        """Move the upload's timestamps back past the expiry."""
+        past = timezone.now() - datetime.timedelta(seconds=settings.FILE_MANAGER_UPLOAD_EXPIRY + 60)
+        ChunkedUpload.objects.filter(pk=self.upload.pk).update(created_at=past, updated_at=past)
+
+    def send_chunk(self, offset, data):
+        return self.client.patch(
+            self.url, data, content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def test_chunk_keeps_upload_from_expiring(self):
+        self.age_upload()
+        self.assertEqual(self.send_chunk(0, b'abcd').status_code, 200)
+
+        self.assertEqual(expire_uploads()['expired'], 0)
+        self.upload.refresh_from_db()
+        self.assertEqual(self.upload.status, 'uploading')
+        self.assertEqual(self.send_chunk(4, b'efgh').status_code, 200)
+        self.upload.refresh_from_db()
+        self.assertEqual(self.upload.status, 'complete')
+
+    def test_idle_upload_expires(self):
+        self.send_chunk(0, b'abcd')
+        self.age_upload()
+
+        self.assertEqual(expire_uploads()['expired'], 1)
+        self.upload.refresh_from_db()
+        self.assertEqual(self.upload.status, 'failed')
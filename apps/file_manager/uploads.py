@@ -0,0 +1,36 @@
+import os
+import datetime
+from django.conf import settings
+from django.utils import timezone
+
+from .models import ChunkedUpload
+from .quotas import release_storage
+
+
+def fail_upload(upload):
+    """
+    Mark an upload failed, delete its part file and release its reservation
+    (to the user and organization it was charged to). Returns False if the
+    upload was no longer in progress, e.g. completed or cancelled meanwhile.
+    """
+    if not ChunkedUpload.objects.filter(pk=upload.pk, status='uploading').update(status='failed', updated_at=timezone.now()):
+        return False
+    upload.status = 'failed'
+    try:
+        os.remove(upload.part_path)
+    except FileNotFoundError:
+        pass
+    release_storage(upload.user_id, upload.organization_id, upload.reserved)
+    return True
+
+
+def expire_uploads():
+    """
+    Fail uploads that received no chunk for FILE_MANAGER_UPLOAD_EXPIRY
+    seconds and delete the records of uploads that ended that long ago.
+    """
+    cutoff = timezone.now() - datetime.timedelta(seconds=settings.FILE_MANAGER_UPLOAD_EXPIRY)
+    stale = ChunkedUpload.objects.filter(updated_at__lt=cutoff)
+    expired = sum(fail_upload(upload) for upload in stale.filter(status='uploading').iterator())
+    deleted, _ = stale.exclude(status='uploading').delete()
+    return {'expired': expired, 'deleted': deleted}
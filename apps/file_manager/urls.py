@@ -7,6 +7,16 @@ urlpatterns = [
     # re_path(r'^(?:/(?P<directory>.*?)/?)?$', views.file_manager, name='file_manager'),
     path('delete-file/<str:file_path>/', views.delete_file, name='delete_file'),
     path('download-file/<str:file_path>/', views.download_file, name='download_file'),
+    re_path(r'^download-directory(?:/(?P<directory>.*?)/?)?$', views.download_directory, name='download_directory'),
     path('upload-file/', views.upload_file, name='upload_file'),
+    path('uploads/', views.create_upload, name='create_upload'),
+    path('uploads/<uuid:upload_id>/', views.chunked_upload, name='chunked_upload'),
     path('save-info/<str:file_path>/', views.save_info, name='save_info'),
+    path('file-list/', views.file_list, name='file_list'),
+    path('file-index-status/', views.file_index_status, name='file_index_status'),
+    path('csv-preview/<str:file_path>/', views.csv_preview, name='csv_preview'),
+    path('csv-profile/<str:file_path>/', views.csv_profile, name='csv_profile'),
+    path('csv-import/<str:file_path>/', views.csv_import, name='csv_import'),
+    path('csv-imports/<int:import_id>/', views.csv_import_status, name='csv_import_status'),
+    re_path(r'^directory-tree(?:/(?P<directory>.*?)/?)?$', views.directory_tree, name='directory_tree'),
 ]
@@ -0,0 +1,102 @@
+import os
+import time
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+
+
+def get_directory_id(path):
+    """Stable id of a directory, derived from its path relative to the user's root."""
+    return hashlib.sha1(path.encode()).hexdigest()[:12]
+
+
+def get_user_media_path(user_id):
+    return os.path.join(settings.MEDIA_ROOT, str(user_id))
+
+
+def resolve_user_path(user_id, relative_path):
+    """
+    Return the absolute path of `relative_path` inside the user's media
+    directory, or None if it points outside of it.
+    """
+    user_root = os.path.realpath(get_user_media_path(user_id))
+    absolute_path = os.path.realpath(os.path.join(user_root, relative_path))
+    if absolute_path != user_root and not absolute_path.startswith(user_root + os.sep):
+        return None
+    return absolute_path
+
+
+def _has_subdirectories(path):
+    try:
+        with os.scandir(path) as entries:
+            return any(entry.is_dir() for entry in entries)
+    except OSError:
+        return False
+
+
+def scan_subdirectories(root_path, relative_path=''):
+    """
+    List the direct subdirectories of `relative_path` (one `os.scandir`),
+    each with whether it has subdirectories of its own.
+    """
+    directories = []
+    try:
+        entries = sorted(os.scandir(os.path.join(root_path, relative_path)), key=lambda entry: entry.name)
+    except OSError:
+        return directories
+    for entry in entries:
+        if not entry.is_dir():
+            continue
+        path = f'{relative_path}/{entry.name}' if relative_path else entry.name
+        directories.append({
+            'id': get_directory_id(path),
+            'name': entry.name,
+            'path': path,
+            'has_children': _has_subdirectories(entry.path),
+        })
+    return directories
+
+
+def _get_tree_generation(user_id):
+    key = f'file_manager:tree:{user_id}:generation'
+    generation = cache.get(key)
+    if generation is None:
+        generation = time.time_ns()
+        cache.add(key, generation, None)
+    return generation
+
+
+def invalidate_directory_tree(user_id):
+    """Drop every cached node of the user's tree (by moving to a new generation)."""
+    cache.set(f'file_manager:tree:{user_id}:generation', time.time_ns(), None)
+
+
+def get_subdirectories(user_id, relative_path=''):
+    """
+    Cached `scan_subdirectories` for one node of the user's tree. Entries are
+    keyed by tree generation, so `invalidate_directory_tree` expires them all.
+    """
+    generation = _get_tree_generation(user_id)
+    key = f'file_manager:tree:{user_id}:{generation}:{get_directory_id(relative_path)}'
+    directories = cache.get(key)
+    if directories is None:
+        directories = scan_subdirectories(get_user_media_path(user_id), relative_path)
+        cache.set(key, directories, settings.FILE_MANAGER_TREE_CACHE_TTL)
+    return directories
+
+
+def get_directory_tree(user_id, expanded_path=''):
+    """
+    Return the top-level directories with only the branch leading to
+    `expanded_path` expanded (in `directories`); other nodes are loaded on
+    demand, so the cost does not grow with the total number of directories.
+    """
+    tree = get_subdirectories(user_id)
+    nodes = tree
+    for name in [part for part in expanded_path.split('/') if part]:
+        node = next((node for node in nodes if node['name'] == name), None)
+        if node is None:
+            break
+        node['directories'] = get_subdirectories(user_id, node['path'])
+        nodes = node['directories']
+    return tree
@@ -1,52 +1,255 @@
 import os
 import csv
-import uuid
+import json
+import base64
+import hashlib
+import binascii
+import datetime
+import itertools
 from django.shortcuts import render, redirect
-from django.http import HttpResponse, Http404
+from django.urls import reverse
+from django.http import HttpResponse, Http404, JsonResponse
 from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+from django.utils.http import urlencode
+from django.template.loader import render_to_string
+from core.downloads import directory_zip_response, file_download_response
 from .models import *
+from .blobs import get_upload_temp_path, remove_stored_file, store_file
+from .catalog import catalog_file, get_catalog_path, is_user_scan_pending, remove_from_catalog, request_csv_profile, request_user_scan
+from .ingest import SALES_IMPORT_FIELDS, guess_sales_mapping
+from .quotas import QuotaExceeded, QuotaUploadHandler, charge_storage, get_storage_usages, release_storage
+from .uploads import fail_upload
+from .utils import get_directory_tree, get_subdirectories, invalidate_directory_tree, resolve_user_path
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 
 # Create your views here.
 
 
-def convert_csv_to_text(csv_file_path):
-    with open(csv_file_path, 'r') as file:
+def read_csv_preview(csv_file_path, max_rows):
+    """
+    Return `(text, truncated)` for the first `max_rows` rows of a CSV file.
+    Rows are streamed from the reader, so only that many are ever read.
+    """
+    with open(csv_file_path, 'r', newline='', encoding='utf-8', errors='replace') as file:
         reader = csv.reader(file)
-        rows = list(reader)
-
-    text = ''
-    for row in rows:
-        text += ','.join(row) + '\n'
-
-    return text
-
-
-def get_files_from_directory(directory_path):
-    files = []
-    for filename in os.listdir(directory_path):
-        file_path = os.path.join(directory_path, filename)
-        if os.path.isfile(file_path):
-            try:
-                print( ' > file_path ' + file_path)
-                _, extension = os.path.splitext(filename)
-                if extension.lower() == '.csv':
-                    csv_text = convert_csv_to_text(file_path)
-                else:
-                    csv_text = ''
-
-                files.append({
-                    'file': file_path.split(os.sep + 'media' + os.sep)[1],
-                    'filename': filename,
-                    'file_path': file_path,
-                    'csv_text': csv_text
-                })
-            except Exception as e:
-                print( ' > ' +  str( e ) )   
+        rows = [','.join(row) for row in itertools.islice(reader, max_rows + 1)]
+    return '\n'.join(rows[:max_rows]), len(rows) > max_rows
 
+
+FILE_SORT_FIELDS = ('name', '-name', 'size', '-size', 'modified', '-modified')
+
+
+def encode_cursor(sort, value, pk):
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([sort, value, pk]).encode()).decode()
+
+
+def decode_cursor(cursor, sort):
+    """`(value, id)` of the last row of the previous page, or None if the cursor is invalid."""
+    try:
+        cursor_sort, value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (value, int(pk)) if cursor_sort == sort else None
+    except (ValueError, TypeError, binascii.Error):
+        return None
+
+
+def get_catalog_page(user, directory='', query='', sort='name', cursor=None):
+    """
+    One page of files from the catalog: one directory, or with `query` every
+    file of the user whose name contains it, sorted by name, size or
+    modification time. Pages are keyset-paginated on (sort field, id), so
+    deep pages cost the same as the first. Returns `(files, next_cursor)`.
+    """
+    sort = sort if sort in FILE_SORT_FIELDS else 'name'
+    field = sort.lstrip('-')
+    descending = sort.startswith('-')
+
+    entries = FileEntry.objects.filter(user=user)
+    if query:
+        entries = entries.filter(name__icontains=query)
+    else:
+        entries = entries.filter(directory=directory.strip('/'))
+
+    position = decode_cursor(cursor, sort) if cursor else None
+    if position is not None:
+        value, pk = position
+        after = 'lt' if descending else 'gt'
+        try:
+            entries = entries.filter(Q(**{f'{field}__{after}': value}) | Q(**{field: value, f'id__{after}': pk}))
+        except (ValueError, ValidationError):
+            entries = entries.none()
+
+    page_size = settings.FILE_MANAGER_PAGE_SIZE
+    entries = list(entries.order_by(sort, '-id' if descending else 'id')[:page_size + 1])
+    next_cursor = None
+    if len(entries) > page_size:
+        entries = entries[:page_size]
+        next_cursor = encode_cursor(sort, getattr(entries[-1], field), entries[-1].id)
+
+    return [{
+        'id': entry.id,
+        'file': entry.path,
+        'filename': entry.name,
+        'file_path': entry.absolute_path,
+        'directory': entry.directory,
+        'size': entry.size,
+        'modified': entry.modified,
+        'mime_type': entry.mime_type,
+        'csv_rows': entry.csv_rows,
+        'csv_columns': entry.csv_columns,
+    } for entry in entries], next_cursor
+
+
+def get_next_page_url(directory, query, sort, cursor):
+    if cursor is None:
+        return None
+    return reverse('file_list') + '?' + urlencode({'directory': directory, 'q': query, 'sort': sort, 'cursor': cursor})
+
+
+def attach_file_info(files):
+    """Set `info` on each file dict from its FileInfo row, in a single query."""
+    infos = dict(
+        FileInfo.objects.filter(path__in=[file['file_path'] for file in files])
+        .order_by('-pk')
+        .values_list('path', 'info')
+    )
+    for file in files:
+        file['info'] = infos.get(file['file_path'], '')
     return files
 
 
+@login_required(login_url='/accounts/login/basic-login/')
+def csv_preview(request, file_path):
+    """
+    HTMX endpoint returning the preview of one CSV file as an HTML fragment.
+
+    The rendered fragment is cached by (path, mtime, size), so re-opening a
+    preview costs one `stat()` until the file changes.
+    """
+    path = file_path.replace('%slash%', '/')
+    absolute_file_path = resolve_user_path(request.user.id, os.path.relpath(path, str(request.user.id)))
+    if absolute_file_path is None or not os.path.isfile(absolute_file_path):
+        raise Http404
+
+    stat = os.stat(absolute_file_path)
+    max_rows = settings.FILE_MANAGER_PREVIEW_ROWS
+    version = f'{absolute_file_path}:{stat.st_mtime_ns}:{stat.st_size}:{max_rows}'
+    cache_key = 'file_manager:csv-preview:' + hashlib.sha256(version.encode()).hexdigest()
+
+    html = cache.get(cache_key)
+    if html is None:
+        text, truncated = read_csv_preview(absolute_file_path, max_rows)
+        html = render_to_string('includes/csv-preview.html', {
+            'text': text,
+            'truncated': truncated,
+            'max_rows': max_rows,
+        })
+        cache.set(cache_key, html, settings.FILE_MANAGER_PREVIEW_CACHE_TTL)
+    return HttpResponse(html)
+
+
+def get_histogram_bars(histogram):
+    peak = max(histogram['counts']) or 1
+    return [
+        {'start': start, 'count': count, 'height': round(100 * count / peak)}
+        for start, count in zip(histogram['edges'], histogram['counts'])
+    ]
+
+
+@login_required(login_url='/accounts/login/basic-login/')
+def csv_profile(request, file_path):
+    """
+    HTMX endpoint returning the column profile of one CSV file.
+
+    Profiles are computed in the background (`profile_csv`) and stored by
+    content hash, so this is two indexed lookups whatever the file size.
+    Until the profile is ready the fragment polls for it.
+    """
+    path = file_path.replace('%slash%', '/')
+    entry = FileEntry.objects.filter(user=request.user, path=path).first()
+    if entry is None or entry.mime_type != 'text/csv':
+        raise Http404
+
+    profile = request_csv_profile(entry.sha256)
+    columns = [
+        {**column, 'bars': get_histogram_bars(column['histogram']) if column.get('histogram') else None}
+        for column in profile.columns
+    ]
+    return render(request, 'includes/csv-profile.html', {
+        'profile': profile,
+        'columns': columns,
+        'file_path': file_path,
+    })
+
+
+def read_csv_header(csv_file_path):
+    with open(csv_file_path, 'r', newline='', encoding='utf-8', errors='replace') as file:
+        try:
+            return next(csv.reader(file), [])
+        except csv.Error:
+            return []
+
+
+@login_required(login_url='/accounts/login/basic-login/')
+def csv_import(request, file_path):
+    """
+    HTMX endpoint for loading a CSV file into the Sales table of the active
+    organization: GET returns the column-mapping form (pre-filled from the
+    header), POST queues the `import_csv` task and returns its progress.
+    """
+    path = file_path.replace('%slash%', '/')
+    entry = FileEntry.objects.filter(user=request.user, path=path).first()
+    if entry is None or entry.mime_type != 'text/csv' or not os.path.isfile(entry.absolute_path):
+        raise Http404
+
+    header = read_csv_header(entry.absolute_path)
+    context = {
+        'file_path': file_path,
+        'columns': list(enumerate(header)),
+        'skip_header': True,
+        'organization_id': _get_organization_id(request),
+    }
+    mapping = guess_sales_mapping(header)
+    if request.method == 'POST' and context['organization_id'] is not None:
+        mapping = {}
+        for field in SALES_IMPORT_FIELDS:
+            value = request.POST.get(field, '')
+            if value.isdigit() and int(value) < len(header):
+                mapping[field] = int(value)
+        skip_header = request.POST.get('skip_header') == 'on'
+        if mapping:
+            new_import = CsvImport.objects.create(
+                user=request.user,
+                organization_id=context['organization_id'],
+                path=entry.path,
+                mapping=mapping,
+                skip_header=skip_header,
+            )
+            from .tasks import import_csv
+            transaction.on_commit(lambda: import_csv.delay(new_import.id))
+            return render(request, 'includes/csv-import.html', {'csv_import': new_import})
+        context.update(skip_header=skip_header, error='Map at least one column.')
+    context['fields'] = [(field, mapping.get(field)) for field in SALES_IMPORT_FIELDS]
+    return render(request, 'includes/csv-import.html', context)
+
+
+@login_required(login_url='/accounts/login/basic-login/')
+def csv_import_status(request, import_id):
+    """HTMX endpoint returning the progress of a CSV import (polled while it runs)."""
+    current_import = CsvImport.objects.filter(pk=import_id, user=request.user).first()
+    if current_import is None:
+        raise Http404
+    return render(request, 'includes/csv-import.html', {'csv_import': current_import})
+
+
 @login_required(login_url='/accounts/login/basic-login/')
 def save_info(request, file_path):
     path = file_path.replace('%slash%', '/')
@@ -82,13 +285,16 @@ def file_manager(request, directory=''):
     if not os.path.exists(media_path):
         os.makedirs(media_path)
         
-    directories = generate_nested_directory(media_path, media_path)
     selected_directory = directory
+    directories = get_directory_tree(request.user.id, selected_directory)
 
-    files = []
-    selected_directory_path = os.path.join(media_path, selected_directory)
-    if os.path.isdir(selected_directory_path):
-        files = get_files_from_directory(selected_directory_path)
+    query = request.GET.get('q', '').strip()
+    sort = request.GET.get('sort', 'name')
+    # First visit, or files added before the catalog existed: indexed in the
+    # background while the page polls `file_index_status`
+    indexing = not FileEntry.objects.filter(user=request.user).exists() and request_user_scan(request.user.id)
+    files, cursor = get_catalog_page(request.user, selected_directory, query, sort)
+    files = attach_file_info(files)
 
     breadcrumbs = get_breadcrumbs(request)
 
@@ -96,45 +302,109 @@ def file_manager(request, directory=''):
         'directories': directories, 
         'files': files, 
         'selected_directory': selected_directory,
+        'query': query,
+        'sort': sort,
+        'indexing': indexing,
+        'next_url': get_next_page_url(selected_directory, query, sort, cursor),
         'segment': 'file_manager',
         'parent': 'apps',
         'breadcrumbs': breadcrumbs,
         'user_id': str(request.user.id),
+        'upload_chunk_size': settings.FILE_MANAGER_UPLOAD_CHUNK_SIZE,
+        'storage_usage': get_storage_usages(request.user.id)[0],
     }
     return render(request, 'pages/apps/file-manager.html', context)
 
 
-def generate_nested_directory(root_path, current_path):
-    directories = []
-    for name in os.listdir(current_path):
-        if os.path.isdir(os.path.join(current_path, name)):
-            unique_id = str(uuid.uuid4())
-            nested_path = os.path.join(current_path, name)
-            nested_directories = generate_nested_directory(root_path, nested_path)
-            directories.append({'id': unique_id, 'name': name, 'path': os.path.relpath(nested_path, root_path), 'directories': nested_directories})
-    return directories
+@login_required(login_url='/accounts/login/basic-login/')
+def file_list(request):
+    """HTMX endpoint returning the rows of the next page of a file listing."""
+    directory = request.GET.get('directory', '')
+    query = request.GET.get('q', '').strip()
+    sort = request.GET.get('sort', 'name')
+    files, cursor = get_catalog_page(request.user, directory, query, sort, request.GET.get('cursor'))
+    return render(request, 'includes/file-rows.html', {
+        'files': attach_file_info(files),
+        'query': query,
+        'next_url': get_next_page_url(directory, query, sort, cursor),
+    })
+
+
+@login_required(login_url='/accounts/login/basic-login/')
+def file_index_status(request):
+    """HTMX endpoint polled while the first scan of the user's files runs; reloads the page when it is done."""
+    if is_user_scan_pending(request.user.id):
+        return render(request, 'includes/file-indexing.html')
+    response = HttpResponse()
+    response['HX-Refresh'] = 'true'
+    return response
+
+
+@login_required(login_url='/accounts/login/basic-login/')
+def directory_tree(request, directory=''):
+    """HTMX endpoint returning the subdirectories of one tree node."""
+    if resolve_user_path(request.user.id, directory) is None:
+        raise Http404
+    return render(request, 'includes/directory-tree.html', {
+        'directories': get_subdirectories(request.user.id, directory.strip('/')),
+    })
 
 @login_required(login_url='/accounts/login/basic-login/')
 def delete_file(request, file_path):
     path = file_path.replace('%slash%', '/')
-    absolute_file_path = os.path.join(settings.MEDIA_ROOT, path)
-    os.remove(absolute_file_path)
+    absolute_file_path = resolve_user_path(request.user.id, os.path.relpath(path, str(request.user.id)))
+    if absolute_file_path is None or not os.path.isfile(absolute_file_path):
+        raise Http404
+    entry = FileEntry.objects.filter(path=get_catalog_path(absolute_file_path)).first()
+    size = os.path.getsize(absolute_file_path)
+    remove_stored_file(absolute_file_path, entry.sha256 if entry else None)
+    remove_from_catalog(absolute_file_path)
+    release_storage(request.user.id, entry.organization_id if entry else None, size)
+    invalidate_directory_tree(request.user.id)
     print("File deleted", absolute_file_path)
     return redirect(request.META.get('HTTP_REFERER'))
 
 @login_required(login_url='/accounts/login/basic-login/')
 def download_file(request, file_path):
     path = file_path.replace('%slash%', '/')
-    absolute_file_path = os.path.join(settings.MEDIA_ROOT, path)
-    if os.path.exists(absolute_file_path):
-        with open(absolute_file_path, 'rb') as fh:
-            response = HttpResponse(fh.read(), content_type="application/vnd.ms-excel")
-            response['Content-Disposition'] = 'inline; filename=' + os.path.basename(absolute_file_path)
-            return response
-    raise Http404
+    absolute_file_path = resolve_user_path(request.user.id, os.path.relpath(path, str(request.user.id)))
+    if absolute_file_path is None:
+        raise Http404
+    return file_download_response(request, absolute_file_path)
+
+def _get_organization_id(request):
+    organization = getattr(request, 'organization', None)
+    return organization.id if organization else None
 
 @login_required(login_url='/accounts/login/basic-login/')
+def download_directory(request, directory=''):
+    """Download a directory of the user, with its subdirectories, as a ZIP archive."""
+    absolute_directory_path = resolve_user_path(request.user.id, directory or '')
+    if absolute_directory_path is None or not os.path.isdir(absolute_directory_path):
+        raise Http404
+    name = os.path.basename(absolute_directory_path.rstrip(os.sep)) if directory else 'media'
+    return directory_zip_response(absolute_directory_path, f'{name}.zip')
+
+@login_required(login_url='/accounts/login/basic-login/')
+@csrf_exempt
 def upload_file(request):
+    # Installed before the CSRF check reads the body, so an upload over quota
+    # is stopped while it is received rather than stored first
+    quota_handler = None
+    if request.method == 'POST':
+        # The target directory is not parsed yet, so allow for the largest
+        # catalogued file of the same name being replaced
+        def get_replaced_size(file_name):
+            entries = FileEntry.objects.filter(user=request.user, name=os.path.basename(file_name))
+            return entries.aggregate(size=Max('size'))['size'] or 0
+
+        quota_handler = QuotaUploadHandler(request, request.user.id, _get_organization_id(request), get_replaced_size)
+        request.upload_handlers.insert(0, quota_handler)
+    return _upload_file(request, quota_handler)
+
+
+@csrf_protect
+def _upload_file(request, quota_handler):
     media_path = os.path.join(settings.MEDIA_ROOT)
     user_subdirectory = str(request.user.id)
     media_user_path = os.path.join(media_path, user_subdirectory)
@@ -143,15 +413,222 @@ def upload_file(request):
     if not os.path.exists(media_user_path):
         os.makedirs(media_user_path)
 
+    organization_id = _get_organization_id(request)
+    if request.method == 'POST' and quota_handler.exceeded:
+        messages.error(request, str(quota_handler.exceeded))
+        return redirect(request.META.get('HTTP_REFERER'))
+
     selected_directory = request.POST.get('directory', '')
     selected_directory_path = os.path.join(media_user_path, selected_directory)
 
-    if request.method == 'POST':
-        file = request.FILES.get('file')
+    if request.method == 'POST' and 'file' in request.FILES:
+        file = request.FILES['file']
         file_path = os.path.join(selected_directory_path, file.name)
 
-        with open(file_path, 'wb') as destination:
+        # Written to a temporary file first, so a file being replaced is never
+        # truncated in place (it may share its content with other files)
+        temp_path = get_upload_temp_path()
+        digest = hashlib.sha256()
+        with open(temp_path, 'wb') as destination:
             for chunk in file.chunks():
+                digest.update(chunk)
                 destination.write(chunk)
+        try:
+            replaced_size = os.path.getsize(file_path) if os.path.isfile(file_path) else 0
+            charge_storage(request.user.id, organization_id, file.size - replaced_size)
+        except QuotaExceeded as e:
+            os.remove(temp_path)
+            messages.error(request, str(e))
+            return redirect(request.META.get('HTTP_REFERER'))
+        store_file(temp_path, file_path, digest.hexdigest())
+        catalog_file(request.user.id, file_path, organization_id, sha256=digest.hexdigest())
+        invalidate_directory_tree(request.user.id)
+
+    return redirect(request.META.get('HTTP_REFERER'))
+
+
+def _upload_response(upload, status=200):
+    response = JsonResponse({
+        'data': {
+            'id': str(upload.id),
+            'url': reverse('chunked_upload', args=[upload.id]),
+            'filename': upload.filename,
+            'size': upload.size,
+            'offset': upload.offset,
+            'sha256': upload.sha256,
+            'status': upload.status,
+        },
+        'success': True
+    }, status=status)
+    response['Upload-Offset'] = str(upload.offset)
+    response['Upload-Length'] = str(upload.size)
+    return response
+
+
+def _upload_error(message, status):
+    return JsonResponse({'message': message, 'success': False}, status=status)
+
+
+def _complete_upload(upload):
+    """
+    Check the assembled file and move it into place. The SHA-256 of the whole
+    file is recorded and, if the client sent one, must match.
+    """
+    digest = hashlib.sha256()
+    with open(upload.part_path, 'rb') as part:
+        for block in iter(lambda: part.read(1024 * 1024), b''):
+            digest.update(block)
+    upload.sha256 = digest.hexdigest()
+
+    if upload.checksum and upload.checksum != upload.sha256:
+        fail_upload(upload)
+    else:
+        store_file(upload.part_path, upload.target_path, upload.sha256)
+        catalog_file(upload.user_id, upload.target_path, upload.organization_id, sha256=upload.sha256)
+        invalidate_directory_tree(upload.user_id)
+        upload.status = 'complete'
+    upload.save(update_fields=['sha256', 'status', 'updated_at'])
+
+
+@login_required(login_url='/accounts/login/basic-login/')
+def create_upload(request):
+    """
+    Start a resumable upload.
+
+    Body: `{"filename", "size", "directory", "checksum"}` where `checksum` is
+    an optional hex SHA-256 of the whole file. Chunks are then sent to the
+    returned `url` (see `chunked_upload`).
+
+    The end-to-end check of the assembled file only covers clients that send
+    `checksum`. The file manager page does not: browsers cannot hash a file
+    incrementally, so it only sends per-chunk `Upload-Checksum` headers, and
+    not even those where `crypto.subtle` is unavailable (plain HTTP).
+    """
+    if request.method != 'POST':
+        return _upload_error('Method not allowed.', 405)
+    try:
+        data = json.loads(request.body)
+        filename = os.path.basename(str(data['filename']))
+        size = int(data['size'])
+    except (ValueError, KeyError, TypeError):
+        return _upload_error('Expected "filename" and "size".', 400)
+
+    directory = str(data.get('directory') or '').strip('/')
+    if filename in ('', '.', '..') or resolve_user_path(request.user.id, directory) is None:
+        return _upload_error('Invalid file name or directory.', 400)
+    if size < 0 or size > settings.FILE_MANAGER_UPLOAD_MAX_SIZE:
+        return _upload_error(f'Files may be at most {settings.FILE_MANAGER_UPLOAD_MAX_SIZE} bytes.', 413)
+
+    # The size is reserved up front (less that of a file being replaced) and
+    # released if the upload fails, is cancelled or expires
+    organization_id = _get_organization_id(request)
+    target_path = os.path.join(settings.MEDIA_ROOT, str(request.user.id), directory, filename)
+    replaced_size = os.path.getsize(target_path) if os.path.isfile(target_path) else 0
+    try:
+        charge_storage(request.user.id, organization_id, size - replaced_size)
+    except QuotaExceeded as e:
+        return _upload_error(str(e), 413)
+
+    upload = ChunkedUpload.objects.create(
+        user=request.user,
+        organization_id=organization_id,
+        reserved=size - replaced_size,
+        directory=directory,
+        filename=filename,
+        size=size,
+        checksum=str(data.get('checksum') or '').lower()
+    )
+    os.makedirs(os.path.dirname(upload.part_path), exist_ok=True)
+    open(upload.part_path, 'wb').close()
+    if size == 0:
+        _complete_upload(upload)
+    return _upload_response(upload, status=201)
+
+
+@login_required(login_url='/accounts/login/basic-login/')
+def chunked_upload(request, upload_id):
+    """
+    Resumable upload protocol, modelled on tus:
+
+    - `GET`: current state; `offset` is where the next chunk must start.
+    - `PATCH`: raw chunk bytes with an `Upload-Offset` header equal to the
+      current offset and an optional `Upload-Checksum: sha256 <base64>`.
+      The chunk is streamed into the part file at that offset; the offset
+      only advances if the whole chunk arrived and its checksum matched, so
+      a failed chunk is simply sent again.
+    - `DELETE`: abort the upload.
+    """
+    upload = ChunkedUpload.objects.filter(id=upload_id, user=request.user).first()
+    if upload is None:
+        return _upload_error('Upload not found.', 404)
+
+    if request.method in ('GET', 'HEAD'):
+        return _upload_response(upload)
+
+    if request.method == 'DELETE':
+        fail_upload(upload)
+        upload.delete()
+        return JsonResponse({'message': 'Upload cancelled.', 'success': True})
+
+    if request.method != 'PATCH':
+        return _upload_error('Method not allowed.', 405)
+    if upload.status != 'uploading':
+        return _upload_error(f'Upload is {upload.status}.', 409)
+
+    try:
+        offset = int(request.headers['Upload-Offset'])
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except (KeyError, ValueError):
+        return _upload_error('Upload-Offset and Content-Length headers are required.', 400)
+    if offset != upload.offset:
+        response = _upload_error('Offset does not match the upload offset.', 409)
+        response['Upload-Offset'] = str(upload.offset)
+        return response
+    if length <= 0 or length > settings.FILE_MANAGER_UPLOAD_CHUNK_SIZE or offset + length > upload.size:
+        return _upload_error(f'Chunks must be 1 to {settings.FILE_MANAGER_UPLOAD_CHUNK_SIZE} bytes and end within the file.', 400)
+
+    expected = None
+    if 'Upload-Checksum' in request.headers:
+        algorithm, _, value = request.headers['Upload-Checksum'].partition(' ')
+        try:
+            expected = base64.b64decode(value, validate=True)
+        except (binascii.Error, ValueError):
+            expected = None
+        if algorithm.lower() != 'sha256' or expected is None:
+            return _upload_error('Upload-Checksum must be "sha256 <base64 digest>".', 400)
+
+    digest = hashlib.sha256()
+    received = 0
+    try:
+        part = open(upload.part_path, 'r+b')
+    except FileNotFoundError:
+        # Expired or cancelled since the upload was loaded
+        return _upload_error('Upload is failed.', 409)
+    with part:
+        part.seek(offset)
+        while received < length:
+            block = request.read(min(64 * 1024, length - received))
+            if not block:
+                break
+            digest.update(block)
+            part.write(block)
+            received += len(block)
+
+    if received != length:
+        return _upload_error('Incomplete chunk; resend it from the current offset.', 400)
+    if expected is not None and digest.digest() != expected:
+        return _upload_error('Chunk checksum mismatch; resend it from the current offset.', 400)
+
+    # Advance only if no concurrent request moved the offset meanwhile. update()
+    # skips auto_now, and updated_at is what expire_uploads measures idleness by
+    updated = ChunkedUpload.objects.filter(id=upload.id, offset=offset, status='uploading').update(
+        offset=offset + length, updated_at=timezone.now()
+    )
+    if not updated:
+        upload.refresh_from_db()
+        return _upload_error('Offset does not match the upload offset.', 409)
 
-    return redirect(request.META.get('HTTP_REFERER'))
\ No newline at end of file
+    upload.offset = offset + length
+    if upload.offset == upload.size:
+        _complete_upload(upload)
+    return _upload_response(upload)
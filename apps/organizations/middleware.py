@@ -4,7 +4,7 @@ from django.contrib import messages
 from django.urls import resolve
 from django.core.exceptions import PermissionDenied
 from django.db.models import Model
-from asgiref.sync import sync_to_async
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 
 from .utils import (
     set_current_user, 
@@ -25,13 +25,57 @@ class OrganizationMiddleware:
     3. Assigns the organization to the request object
     4. Restricts certain operations for inactive organizations
     5. Cleans up the organization context at the end of the request
+
+    It supports both sync and async request handling; under ASGI the
+    membership lookups run in a worker thread and the rest of the request
+    stays on the event loop.
     """
+    sync_capable = True
+    async_capable = True
+
+    # Signed file URLs are authorized by their signature alone
+    skip_paths = ['/signed-files/']
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
         
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        response = self.process_request(request)
+        if response is None:
+            # Process the request
+            response = self.get_response(request)
+        
+        # Clean up at the end of the request
+        clear_organization_context()
+        
+        return response
+
+    async def __acall__(self, request):
+        # The context variables set in the worker thread are copied back
+        # into this coroutine's context by sync_to_async
+        response = await sync_to_async(self.process_request)(request)
+        if response is None:
+            response = await self.get_response(request)
+        clear_organization_context()
+        return response
+
+    def process_request(self, request):
+        """
+        Set up the organization context for the request.
+
+        Returns a redirect response if the request must be blocked, else None.
+        """
         # Clear organization context at the start of each request
         clear_organization_context()
+
+        # Checked before touching request.user, which loads the session
+        if any(request.path.startswith(path) for path in self.skip_paths):
+            return None
         
         if request.user.is_authenticated:
             # Set the current user
@@ -100,13 +144,7 @@ class OrganizationMiddleware:
                     else:
                         return redirect('dashboard')
         
-        # Process the request
-        response = self.get_response(request)
-        
-        # Clean up at the end of the request
-        clear_organization_context()
-        
-        return response
+        return None
 
 
 class OrganizationMiddlewareAsync:
@@ -166,21 +204,42 @@ class OrganizationSecurityMiddleware:
     This middleware:
     1. Validates that context data in responses only contains objects from the current organization
     2. Prevents cross-organization data leakage
+
+    Like OrganizationMiddleware it supports both sync and async handling.
     """
+    sync_capable = True
+    async_capable = True
+
+    # Skip admin, static, media, signed file and API requests
+    skip_paths = ['/admin/', '/static/', '/media/', '/signed-files/', '/api/']
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
         
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
         # Process request normally
         response = self.get_response(request)
-        
-        # Skip for anonymous users, superusers, or non-HTML responses
-        if not request.user.is_authenticated or request.user.is_superuser:
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        # Checked before touching request.user so skipped paths never leave the event loop
+        if any(request.path.startswith(path) for path in self.skip_paths):
             return response
-            
+        return await sync_to_async(self.process_response)(request, response)
+
+    def process_response(self, request, response):
         # Skip admin, static, media, and API requests
-        skip_paths = ['/admin/', '/static/', '/media/', '/api/']
-        if any(request.path.startswith(path) for path in skip_paths):
+        if any(request.path.startswith(path) for path in self.skip_paths):
+            return response
+
+        # Skip for anonymous users, superusers, or non-HTML responses
+        if not request.user.is_authenticated or request.user.is_superuser:
             return response
             
         # Only process TemplateResponse objects that have context_data
@@ -1,7 +1,10 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from core.thumbnails import schedule_thumbnails
+from apps.api.authentication import invalidate_active_organization
+from apps.file_manager.quotas import charge_file_change, get_stored_file_name, release_file
 from .models import Organization, OrganizationMembership, Role, Permission
 
 User = get_user_model()
@@ -86,3 +89,38 @@ def ensure_system_roles_exist():
         # Add permissions to the role
         permissions_to_add = Permission.objects.filter(codename__in=permission_codes)
         role.permissions.add(*permissions_to_add)
+
+
+@receiver(post_save, sender=Organization)
+def create_logo_thumbnails(sender, instance, **kwargs):
+    schedule_thumbnails(instance.logo)
+
+
+@receiver(pre_save, sender=Organization)
+def remember_stored_logo(sender, instance, update_fields=None, **kwargs):
+    instance._stored_logo = get_stored_file_name(instance, 'logo', update_fields)
+
+
+@receiver(post_save, sender=Organization)
+def charge_logo(sender, instance, **kwargs):
+    # Logos count against their organization only, as in reconcile_storage_usage
+    charge_file_change(instance.logo, instance._stored_logo, organization_id=instance.pk)
+
+
+@receiver(post_delete, sender=Organization)
+def release_logo(sender, instance, **kwargs):
+    release_file(instance.logo, organization_id=instance.pk)
+
+
+@receiver(post_save, sender=OrganizationMembership)
+@receiver(post_delete, sender=OrganizationMembership)
+def invalidate_member_organization(sender, instance, **kwargs):
+    # Token requests cache the user's active organization
+    invalidate_active_organization(instance.user_id)
+
+
+@receiver(post_save, sender=Organization)
+def invalidate_organization_members(sender, instance, **kwargs):
+    # The cached organization carries is_active, checked for token writes
+    for user_id in instance.memberships.values_list('user_id', flat=True):
+        invalidate_active_organization(user_id)
@@ -7,7 +7,8 @@ from django.utils import timezone
 class SalesForm(forms.ModelForm):
     class Meta:
         model = Sales
-        fields = '__all__'
+        # organization is taken from the request, not the form
+        exclude = ['organization']
         widgets = {
             'PurchaseDate': forms.widgets.DateInput(attrs={'type': 'date', 'value': timezone.now().strftime('%Y-%m-%d')})
         }
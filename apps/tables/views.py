@@ -1,7 +1,8 @@
 import json
 import csv
 from django.http import HttpResponse, JsonResponse
-from django.shortcuts import render, redirect
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import get_object_or_404, render, redirect
 from apps.tables.forms import SalesForm
 from apps.common.models import Sales
 from apps.tables.models import HideShowFilter, ModelFilter, PageItems
@@ -15,6 +16,10 @@ from django.views import View
 
 # Create your views here.
 
+def get_sales_field_names():
+    # organization is the tenant key, not a column to show, filter or export
+    return [field.name for field in Sales._meta.get_fields() if field.name != 'organization']
+
 
 def create_filter(request):
     if request.method == "POST":
@@ -63,7 +68,7 @@ def delete_filter(request, id):
     return redirect(request.META.get('HTTP_REFERER'))
 
 def datatables(request):
-    db_field_names = [field.name for field in Sales._meta.get_fields()]
+    db_field_names = get_sales_field_names()
 
     # hide show column
     field_names = []
@@ -125,22 +130,25 @@ def datatables(request):
 
 @login_required(login_url='/accounts/login/basic-login/')
 def post_request_handling(request, form):
+    if getattr(request, 'organization', None) is None:
+        raise PermissionDenied('No active organization.')
+    form.instance.organization = request.organization
     form.save()
     return redirect(request.META.get('HTTP_REFERER'))
 
 @login_required(login_url='/accounts/login/basic-login/')
 def delete(request, id):
-    sale = Sales.objects.get(ID=id)
+    sale = get_object_or_404(Sales, ID=id)
     sale.delete()
     return redirect(request.META.get('HTTP_REFERER'))
 
 
 @login_required(login_url='/accounts/login/basic-login/')
 def update(request, id):
-    sales = Sales.objects.get(ID=id)
+    sales = get_object_or_404(Sales, ID=id)
     if request.method == 'POST':
         for attribute, value in request.POST.items():
-            if attribute == 'csrfmiddlewaretoken':
+            if attribute in ('csrfmiddlewaretoken', 'organization', 'Version', 'UpdatedAt'):
                 continue
 
             if getattr(sales, attribute, value) is not None:
@@ -155,7 +163,7 @@ def update(request, id):
 # Export as CSV
 class ExportCSVView(View):
     def get(self, request):
-        db_field_names = [field.name for field in Sales._meta.get_fields()]
+        db_field_names = get_sales_field_names()
         fields = []
         show_fields = HideShowFilter.objects.filter(value=False, parent=ModelChoices.SALES)
         for field in show_fields:
@@ -14,6 +14,7 @@ from django.http import HttpResponse, Http404
 from os import listdir
 from os.path import isfile, join
 from django.conf import settings
+from core.downloads import file_download_response
 
 from django.template  import loader
 
@@ -148,10 +149,7 @@ def task_log(request):
     return HttpResponse(task_log)
 
 def download_log_file(request, file_path):
-    path = file_path.replace('%slash%', '/')
-    if os.path.exists(path):
-        with open(path, 'rb') as fh:
-            response = HttpResponse(fh.read(), content_type="application/vnd.ms-excel")
-            response['Content-Disposition'] = 'inline; filename=' + os.path.basename(path)
-            return response
-    raise Http404
\ No newline at end of file
+    path = os.path.realpath(file_path.replace('%slash%', '/'))
+    if not path.startswith(os.path.realpath(settings.CELERY_LOGS_DIR) + os.sep):
+        raise Http404
+    return file_download_response(request, path, content_type='text/plain')
\ No newline at end of file
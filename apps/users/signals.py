@@ -1,8 +1,11 @@
 from django.contrib.auth.models import User
 from apps.users.models import Profile
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 from rest_framework.authtoken.models import Token
+from apps.api.authentication import invalidate_token
+from core.thumbnails import schedule_thumbnails
+from apps.file_manager.quotas import charge_file_change, get_stored_file_name, release_file
 
 @receiver(post_save, sender=User)
 def create_profile(sender, instance, created, **kwargs):
@@ -15,3 +18,40 @@ def create_profile(sender, instance, created, **kwargs):
 
         # Create auth token
         Token.objects.create(user=instance)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    # Covers Profile.regenerate_token and the regenerate_token view
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, created, update_fields=None, **kwargs):
+    # Cached tokens carry a copy of the user, so drop them when the user changes
+    # (including deactivation). Login only touches last_login and is skipped.
+    if created or (update_fields and set(update_fields) == {'last_login'}):
+        return
+    for key in Token.objects.filter(user=instance).values_list('key', flat=True):
+        invalidate_token(key)
+
+
+@receiver(post_save, sender=Profile)
+def create_avatar_thumbnails(sender, instance, **kwargs):
+    schedule_thumbnails(instance.avatar)
+
+
+@receiver(pre_save, sender=Profile)
+def remember_stored_avatar(sender, instance, update_fields=None, **kwargs):
+    instance._stored_avatar = get_stored_file_name(instance, 'avatar', update_fields)
+
+
+@receiver(post_save, sender=Profile)
+def charge_avatar(sender, instance, **kwargs):
+    # Avatars count against their user only, as in reconcile_storage_usage
+    charge_file_change(instance.avatar, instance._stored_avatar, user_id=instance.user_id)
+
+
+@receiver(post_delete, sender=Profile)
+def release_avatar(sender, instance, **kwargs):
+    release_file(instance.avatar, user_id=instance.user_id)
@@ -1,3 +1,51 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from apps.file_manager.models import StorageUsage
+from apps.file_manager.quotas import reconcile_storage_usage
+
+
+class AvatarStorageUsageTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user('avatar-owner', password='password')
+        self.profile = self.user.profile
+        self.organization = self.user.owned_organizations.get()
+
+    def get_used(self, **owner):
+        return StorageUsage.objects.get_or_create(**owner)[0].used
+
+    def set_avatar(self, name, size):
+        self.profile.avatar = SimpleUploadedFile(name, b'x' * size)
+        self.profile.save()
+
+    def test_replaced_avatar_is_released(self):
+        self.set_avatar('first.png', 3000)
+        self.set_avatar('second.png', 1000)
+
+        self.assertEqual(self.get_used(user=self.user), 1000)
+        self.assertEqual(self.get_used(organization=self.organization), 0)
+
+    def test_usage_is_unchanged_by_reconcile_after_avatar_change(self):
+        self.set_avatar('first.png', 3000)
+        self.set_avatar('second.png', 1000)
+        user_used = self.get_used(user=self.user)
+        organization_used = self.get_used(organization=self.organization)
+
+        reconcile_storage_usage()
+        self.assertEqual(self.get_used(user=self.user), user_used)
+        self.assertEqual(self.get_used(organization=self.organization), organization_used)
+
+    def test_deleted_profile_releases_avatar(self):
+        self.set_avatar('first.png', 3000)
+        self.profile.delete()
+
+        self.assertEqual(self.get_used(user=self.user), 0)
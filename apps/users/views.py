@@ -2,7 +2,9 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
 from apps.users.models import Profile
 from apps.users.forms import ProfileForm, QuillFieldForm
+from apps.file_manager.quotas import QuotaUploadHandler
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.contrib.auth.hashers import check_password
 from django.contrib import messages
 from rest_framework.authtoken.models import Token
@@ -38,9 +40,25 @@ def profile(request):
     return render(request, 'pages/apps/user-profile.html', context)
 
 
+@csrf_exempt
 def upload_avatar(request):
+    # Installed before the CSRF check reads the body, so an avatar over quota
+    # is stopped while it is received rather than stored first
+    quota_handler = None
+    if request.method == 'POST' and request.user.is_authenticated:
+        organization = getattr(request, 'organization', None)
+        quota_handler = QuotaUploadHandler(request, request.user.id, organization.id if organization else None)
+        request.upload_handlers.insert(0, quota_handler)
+    return _upload_avatar(request, quota_handler)
+
+
+@csrf_protect
+def _upload_avatar(request, quota_handler):
     profile = get_object_or_404(Profile, user=request.user)
     if request.method == 'POST':
+        if quota_handler.exceeded:
+            messages.error(request, str(quota_handler.exceeded))
+            return redirect(request.META.get('HTTP_REFERER'))
         profile.avatar = request.FILES.get('avatar')
         profile.save()
         messages.success(request, 'Avatar uploaded successfully')
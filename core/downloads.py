@@ -0,0 +1,212 @@
+import os
+import re
+import zipfile
+import mimetypes
+from urllib.parse import quote
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+# Stored as-is in ZIP archives: deflating them again costs CPU and saves nothing
+COMPRESSED_EXTENSIONS = {
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.7z', '.rar', '.zst',
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic',
+    '.mp3', '.mp4', '.m4a', '.mov', '.webm', '.ogg', '.avi', '.mkv',
+    '.pdf', '.docx', '.xlsx', '.pptx', '.odt', '.ods', '.parquet',
+}
+
+
+def get_x_accel_location(path):
+    """
+    Return the nginx internal location serving `path` when X-Accel-Redirect
+    offloading is enabled and the file lives under one of
+    DOWNLOAD_X_ACCEL_LOCATIONS, else None.
+    """
+    if not settings.DOWNLOAD_X_ACCEL_REDIRECT:
+        return None
+    for root, location in settings.DOWNLOAD_X_ACCEL_LOCATIONS.items():
+        root = os.path.realpath(root)
+        if path.startswith(root + os.sep):
+            return location.rstrip('/') + '/' + quote(os.path.relpath(path, root).replace(os.sep, '/'))
+    return None
+
+
+def parse_range(header, size):
+    """
+    Parse a `Range` header into an inclusive `(start, end)` byte range.
+
+    Returns None when the header is absent or not a single byte range (the
+    whole file is sent then), and False when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header or '')
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # Suffix range: the last `end` bytes
+        length = int(end)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def range_applies(request, etag, last_modified):
+    """`If-Range`: only honour `Range` if the client's copy is still current."""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def _read_range(file, start, length):
+    file.seek(start)
+    while length > 0:
+        data = file.read(min(CHUNK_SIZE, length))
+        if not data:
+            break
+        length -= len(data)
+        yield data
+
+
+def file_download_response(request, path, content_type=None, filename=None, as_attachment=False):
+    """
+    Stream a file from disk without loading it into memory.
+
+    Supports conditional requests (`If-None-Match`/`If-Modified-Since`) and a
+    single HTTP byte range (`Range`, guarded by `If-Range`), so interrupted
+    downloads can resume. With DOWNLOAD_X_ACCEL_REDIRECT the body is left to
+    nginx through an `X-Accel-Redirect` header, which handles ranges itself.
+    """
+    path = os.path.realpath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        raise Http404
+    if not os.path.isfile(path):
+        raise Http404
+
+    size = stat.st_size
+    last_modified = int(stat.st_mtime)
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    if content_type is None:
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    disposition = content_disposition_header(as_attachment, filename or os.path.basename(path))
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return response
+
+    location = get_x_accel_location(path)
+    if location:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = location
+    else:
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+        if byte_range is not None and not range_applies(request, etag, last_modified):
+            byte_range = None
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+        file = open(path, 'rb')
+        if byte_range is None:
+            response = FileResponse(file, content_type=content_type)
+        else:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(_read_range(file, start, length), status=206, content_type=content_type)
+            response._resource_closers.append(file.close)
+            response['Content-Length'] = str(length)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Content-Disposition'] = disposition
+    return response
+
+
+class _ZipStream:
+    """Write-only file object collecting what ZipFile writes, for `zip_stream`."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def zip_stream(files):
+    """
+    Yield a ZIP archive of `files` (`(path, name in archive)` pairs) as it is
+    written. Each file is read in CHUNK_SIZE blocks and its compressed bytes
+    are yielded straight away, so memory use does not depend on file sizes.
+    Files in COMPRESSED_EXTENSIONS are stored without compression.
+    """
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, mode='w') as archive:
+        for path, name in files:
+            try:
+                info = zipfile.ZipInfo.from_file(path, name)
+                file = open(path, 'rb')
+            except OSError:
+                continue
+            if os.path.splitext(name)[1].lower() in COMPRESSED_EXTENSIONS:
+                info.compress_type = zipfile.ZIP_STORED
+            else:
+                info.compress_type = zipfile.ZIP_DEFLATED
+            with file, archive.open(info, mode='w') as entry:
+                for block in iter(lambda: file.read(CHUNK_SIZE), b''):
+                    entry.write(block)
+                    if stream.chunks:
+                        yield stream.pop()
+            yield stream.pop()
+    # Central directory
+    yield stream.pop()
+
+
+def directory_zip_response(root, filename):
+    """
+    Stream the files under directory `root` as a ZIP download. Symbolic links
+    leading outside `root` are skipped.
+    """
+    root = os.path.realpath(root)
+
+    def files():
+        for directory, directories, filenames in os.walk(root):
+            directories.sort()
+            for name in sorted(filenames):
+                path = os.path.join(directory, name)
+                if not os.path.realpath(path).startswith(root + os.sep):
+                    continue
+                yield path, os.path.relpath(path, root).replace(os.sep, '/')
+
+    response = StreamingHttpResponse(zip_stream(files()), content_type='application/zip')
+    response['Content-Disposition'] = content_disposition_header(True, filename)
+    # Keep nginx from spooling the archive to a temporary file
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -270,6 +270,48 @@ FILE_UPLOAD_PERMISSIONS = 0o644
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 MAX_UPLOAD_SIZE = 50 * 1024 * 1024  # 50MB
 
+# Storage quotas in bytes (0 = unlimited); StorageUsage.quota overrides them
+STORAGE_QUOTA_USER         = int(os.getenv('STORAGE_QUOTA_USER', 1024 * 1024 * 1024))
+STORAGE_QUOTA_ORGANIZATION = int(os.getenv('STORAGE_QUOTA_ORGANIZATION', 10 * 1024 * 1024 * 1024))
+
+# Protected files (avatars, logos): SecureFileStorage.url() returns signed URLs
+# valid for one to two TTLs (seconds), served without session or database
+PROTECTED_FILES_SIGNED_URLS = str2bool(os.getenv('PROTECTED_FILES_SIGNED_URLS', 'True'))
+PROTECTED_FILES_URL_TTL     = int(os.getenv('PROTECTED_FILES_URL_TTL', 60 * 60))
+
+# Avatar and logo thumbnails: name -> max pixels per side
+THUMBNAIL_SIZES   = {'sm': 64, 'md': 160, 'lg': 512}
+THUMBNAIL_FORMAT  = os.getenv('THUMBNAIL_FORMAT', 'WEBP')  # WEBP or JPEG
+THUMBNAIL_QUALITY = int(os.getenv('THUMBNAIL_QUALITY', 82))
+
+# File manager CSV previews (first N rows, cached per file version)
+FILE_MANAGER_PREVIEW_ROWS      = int(os.getenv('FILE_MANAGER_PREVIEW_ROWS', 50))
+FILE_MANAGER_PREVIEW_CACHE_TTL = int(os.getenv('FILE_MANAGER_PREVIEW_CACHE_TTL', 60 * 60))
+
+# File manager directory tree index (per user, invalidated on upload/delete)
+FILE_MANAGER_TREE_CACHE_TTL = int(os.getenv('FILE_MANAGER_TREE_CACHE_TTL', 24 * 60 * 60))
+
+# File manager resumable uploads
+FILE_MANAGER_UPLOAD_CHUNK_SIZE = int(os.getenv('FILE_MANAGER_UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))
+FILE_MANAGER_UPLOAD_MAX_SIZE   = int(os.getenv('FILE_MANAGER_UPLOAD_MAX_SIZE', 5 * 1024 * 1024 * 1024))
+FILE_MANAGER_UPLOAD_EXPIRY     = int(os.getenv('FILE_MANAGER_UPLOAD_EXPIRY', 24 * 60 * 60))  # seconds without a chunk
+
+# File manager content-addressed storage: each distinct upload is stored once
+# under MEDIA_ROOT/.blobs/ and user files are hard links to it
+FILE_MANAGER_DEDUPLICATE = str2bool(os.getenv('FILE_MANAGER_DEDUPLICATE', 'False'))
+
+# File manager catalog: seconds between background scans of MEDIA_ROOT
+FILE_MANAGER_CATALOG_SCAN_INTERVAL = int(os.getenv('FILE_MANAGER_CATALOG_SCAN_INTERVAL', 15 * 60))
+
+# File manager listings: files per page (further pages load on scroll)
+FILE_MANAGER_PAGE_SIZE = int(os.getenv('FILE_MANAGER_PAGE_SIZE', 100))
+
+# File manager CSV profiles: rows read per file (0 = all)
+FILE_MANAGER_PROFILE_MAX_ROWS = int(os.getenv('FILE_MANAGER_PROFILE_MAX_ROWS', 10 * 1000 * 1000))
+
+# File manager CSV imports into the Sales table: rows per bulk insert
+FILE_MANAGER_IMPORT_BATCH_SIZE = int(os.getenv('FILE_MANAGER_IMPORT_BATCH_SIZE', 5000))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -328,6 +370,17 @@ CELERY_WORKER_MAX_TASKS_PER_CHILD = 1000
 
 # Celery Beat Schedule
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
+CELERY_IMPORTS = ['core.thumbnails']
+CELERY_BEAT_SCHEDULE = {
+    'scan-file-catalog': {
+        'task': 'apps.file_manager.tasks.scan_file_catalog',
+        'schedule': FILE_MANAGER_CATALOG_SCAN_INTERVAL,
+    },
+    'expire-chunked-uploads': {
+        'task': 'apps.file_manager.tasks.expire_chunked_uploads',
+        'schedule': 60 * 60,
+    },
+}
 
 # Add django_celery_beat to INSTALLED_APPS if not already there
 if 'django_celery_beat' not in INSTALLED_APPS:
@@ -478,6 +531,14 @@ CELERY_TASK_SERIALIZER    = 'json'
 CELERY_RESULT_SERIALIZER  = 'json'
 ########################################
 
+# File downloads: when enabled, files under these directories are sent by
+# nginx (X-Accel-Redirect to the matching internal location, see nginx/)
+DOWNLOAD_X_ACCEL_REDIRECT  = str2bool(os.getenv('DOWNLOAD_X_ACCEL_REDIRECT', 'False'))
+DOWNLOAD_X_ACCEL_LOCATIONS = {
+    MEDIA_ROOT     : '/protected/media/',
+    CELERY_LOGS_DIR: '/protected/tasks_logs/',
+}
+
 X_FRAME_OPTIONS = 'SAMEORIGIN'
 
 # ### API-GENERATOR Settings ###
@@ -485,14 +546,44 @@ API_GENERATOR = {
     'sales'   : "apps.common.models.Sales",
 }
 
+# Sales API list pagination and NDJSON streaming
+API_PAGE_SIZE         = int(os.getenv('API_PAGE_SIZE', 100))
+API_MAX_PAGE_SIZE     = int(os.getenv('API_MAX_PAGE_SIZE', 1000))
+API_STREAM_CHUNK_SIZE = int(os.getenv('API_STREAM_CHUNK_SIZE', 2000))
+
+# Sales API bulk operations
+API_BULK_MAX_ITEMS        = int(os.getenv('API_BULK_MAX_ITEMS', 10000))
+API_BULK_CHUNK_SIZE       = int(os.getenv('API_BULK_CHUNK_SIZE', 500))
+API_BULK_COMMIT_PER_CHUNK = str2bool(os.getenv('API_BULK_COMMIT_PER_CHUNK', 'False'))
+
+# API batch endpoint
+API_BATCH_MAX_REQUESTS = int(os.getenv('API_BATCH_MAX_REQUESTS', 20))
+API_BATCH_MAX_WORKERS  = int(os.getenv('API_BATCH_MAX_WORKERS', 4))
+
+# API token cache (Redis TTL and per-process LRU)
+API_TOKEN_CACHE_TTL        = int(os.getenv('API_TOKEN_CACHE_TTL', 300))
+API_TOKEN_LOCAL_CACHE_TTL  = int(os.getenv('API_TOKEN_LOCAL_CACHE_TTL', 5))
+API_TOKEN_LOCAL_CACHE_SIZE = int(os.getenv('API_TOKEN_LOCAL_CACHE_SIZE', 1024))
+
+# API rate limits (token bucket in Redis); organizations can override these
+# through an `api_throttle_rates` entry in Organization.settings
+API_THROTTLE_RATES = {
+    'anon'        : os.getenv('API_THROTTLE_ANON_RATE', '60/min'),
+    'token'       : os.getenv('API_THROTTLE_TOKEN_RATE', '600/min'),
+    'organization': os.getenv('API_THROTTLE_ORGANIZATION_RATE', '3000/min'),
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'apps.api.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'apps.api.throttling.RedisRateThrottle',
+    ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 ########################################
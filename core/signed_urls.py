@@ -0,0 +1,41 @@
+import time
+from django.conf import settings
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+SALT = 'core.signed_urls'
+NO_SCOPE = '-'         # issued outside any organization
+SUPERUSER_SCOPE = '*'  # issued to a superuser: no organization check
+
+
+def get_signature(path, expires, scope):
+    """HMAC-SHA256 (keyed by SECRET_KEY) of a storage path, expiry time and scope."""
+    return salted_hmac(SALT, f'{path}\n{expires}\n{scope}', algorithm='sha256').hexdigest()
+
+
+def get_expiry(now=None):
+    """
+    Expiry time of URLs signed now: the end of the next PROTECTED_FILES_URL_TTL
+    window, so a URL is valid for one to two TTLs and stays the same for a
+    whole window, letting browsers and caches reuse it across page views.
+    """
+    ttl = settings.PROTECTED_FILES_URL_TTL
+    now = int(time.time() if now is None else now)
+    return (now // ttl + 2) * ttl
+
+
+def get_signed_url(path, scope=NO_SCOPE):
+    expires = get_expiry()
+    return reverse('serve_signed_file', kwargs={
+        'expires': expires,
+        'scope': scope,
+        'signature': get_signature(path, expires, scope),
+        'path': path,
+    })
+
+
+def verify_signature(path, expires, scope, signature):
+    """True if `signature` was issued for these values and has not expired. Needs no session or database."""
+    if expires < time.time():
+        return False
+    return constant_time_compare(signature, get_signature(path, expires, scope))
@@ -3,6 +3,7 @@ from django.core.files.storage import Storage, default_storage
 from django.utils.deconstruct import deconstructible
 from django.conf import settings
 from django.urls import reverse
+from core.signed_urls import NO_SCOPE, SUPERUSER_SCOPE, get_signed_url
 import logging
 
 logger = logging.getLogger('core.storage')
@@ -42,6 +43,18 @@ class SecureFileStorage(Storage):
             return f"{self.collection}/{name}"
         return name
         
+    def _get_url_scope(self):
+        """
+        Scope of the signed URLs issued now: the current organization, whose
+        files (and the shared collections) they may reach.
+        """
+        from apps.organizations.utils import get_current_organization, get_current_user
+        user = get_current_user()
+        if user and user.is_superuser:
+            return SUPERUSER_SCOPE
+        organization = get_current_organization()
+        return str(organization.id) if organization else NO_SCOPE
+
     def _save(self, name, content):
         """Save the file using the underlying storage"""
         path = self._get_path(name)
@@ -72,12 +85,16 @@ class SecureFileStorage(Storage):
         Return a URL for the file.
         
         For private files, return a URL to the Django view that will serve the file
-        with permission checks.
+        with permission checks: a signed, expiring URL with
+        PROTECTED_FILES_SIGNED_URLS, else one requiring a login.
         For public files, return a direct URL to the storage backend.
         """
         path = self._get_path(name)
         
         if self.private:
+            if settings.PROTECTED_FILES_SIGNED_URLS:
+                # Time-limited URL, verified without the session or database
+                return get_signed_url(path, self._get_url_scope())
             # Return URL to Django view for secure file access
             return reverse('serve_protected_file', kwargs={
                 'path': path
@@ -0,0 +1,99 @@
+import io
+import os
+import re
+import logging
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from apps.tasks.celery import app
+
+logger = logging.getLogger('core.thumbnails')
+
+# "<dir>/thumbnails/<size>/<original name>.<ext>" next to the original image
+THUMBNAIL_RE = re.compile(r'^(?P<directory>(?:.*/)?)thumbnails/(?P<size>\w+)/(?P<name>[^/]+)\.(?:webp|jpg)$')
+
+
+def _get_format():
+    return 'JPEG' if settings.THUMBNAIL_FORMAT.upper() in ('JPG', 'JPEG') else 'WEBP'
+
+
+def get_thumbnail_path(path, size):
+    """Storage path of the `size` thumbnail of the image at `path`."""
+    directory, name = os.path.split(path)
+    extension = 'jpg' if _get_format() == 'JPEG' else 'webp'
+    return '/'.join(filter(None, [directory, 'thumbnails', size, f'{name}.{extension}']))
+
+
+def get_original_path(thumbnail_path):
+    """Return `(original path, size)` for a thumbnail path, or None."""
+    match = THUMBNAIL_RE.match(thumbnail_path)
+    if not match or match.group('size') not in settings.THUMBNAIL_SIZES:
+        return None
+    return match.group('directory') + match.group('name'), match.group('size')
+
+
+def make_thumbnail(path, size):
+    """
+    Render the `size` thumbnail of the image at storage path `path` (at most
+    THUMBNAIL_SIZES[size] pixels on each side, aspect ratio kept) and save
+    it. Returns the thumbnail path, or None if the original is not an image.
+    """
+    pixels = settings.THUMBNAIL_SIZES[size]
+    image_format = _get_format()
+    try:
+        with default_storage.open(path) as file:
+            image = Image.open(file)
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((pixels, pixels), Image.LANCZOS)
+    except (FileNotFoundError, UnidentifiedImageError, OSError) as e:
+        logger.warning(f"Cannot create thumbnail of {path}: {e}")
+        return None
+
+    if image_format == 'JPEG' or image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGB' if image_format == 'JPEG' else 'RGBA')
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, quality=settings.THUMBNAIL_QUALITY)
+
+    thumbnail_path = get_thumbnail_path(path, size)
+    # Replace, do not rename: the thumbnail URL must stay the same
+    default_storage.delete(thumbnail_path)
+    default_storage.save(thumbnail_path, ContentFile(buffer.getvalue()))
+    return thumbnail_path
+
+
+@app.task
+def generate_thumbnails(path):
+    """Create every missing THUMBNAIL_SIZES thumbnail of the image at `path`."""
+    return [
+        make_thumbnail(path, size) for size in settings.THUMBNAIL_SIZES
+        if not default_storage.exists(get_thumbnail_path(path, size))
+    ]
+
+
+def schedule_thumbnails(image_field):
+    """
+    Queue `generate_thumbnails` for an ImageField value once the transaction
+    commits, unless its thumbnails exist already.
+    """
+    if not image_field:
+        return
+    path = image_field.storage._get_path(image_field.name)
+    if all(default_storage.exists(get_thumbnail_path(path, size)) for size in settings.THUMBNAIL_SIZES):
+        return
+    transaction.on_commit(lambda: generate_thumbnails.delay(path))
+
+
+def get_thumbnail_url(image_field, size):
+    """
+    URL of a thumbnail of an ImageField value. It does not need to exist yet:
+    the file-serving views render missing thumbnails on first request.
+    """
+    if not image_field:
+        return ''
+    if size not in settings.THUMBNAIL_SIZES:
+        return image_field.url
+    storage = image_field.storage
+    return storage.url(get_thumbnail_path(storage._get_path(image_field.name), size))
@@ -21,7 +21,7 @@ from django.conf.urls.static import static
 from django.conf.urls.i18n import i18n_patterns
 from home import views
 from django.views.static import serve
-from core.views import serve_protected_file
+from core.views import serve_protected_file, serve_signed_file
 
 handler404 = 'home.views.error_404'
 handler500 = 'home.views.error_500'
@@ -40,6 +40,7 @@ urlpatterns = [
 
     # Protected file serving
     path('protected-files/<path:path>', serve_protected_file, name='serve_protected_file'),
+    path('signed-files/<int:expires>/<str:scope>/<str:signature>/<path:path>', serve_signed_file, name='serve_signed_file'),
 
     # Static and media files (for development)
     re_path(r'^media/(?P<path>.*)$', serve,{'document_root': settings.MEDIA_ROOT}),
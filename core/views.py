@@ -1,54 +1,55 @@
 import os
+import time
 import mimetypes
-from django.http import HttpResponse, Http404, FileResponse
+from django.http import HttpResponse, HttpResponseForbidden, Http404, FileResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date
 from django.core.files.storage import default_storage
 from django.contrib.auth.decorators import login_required
 from django.conf import settings
 from apps.organizations.utils import get_current_organization
+from core.downloads import file_download_response
+from core.signed_urls import NO_SCOPE, SUPERUSER_SCOPE, verify_signature
+from core.thumbnails import get_original_path, make_thumbnail
 import logging
 
 logger = logging.getLogger('core.views')
 
-@login_required
-def serve_protected_file(request, path):
+# Collections readable by members of any organization
+SHARED_COLLECTIONS = ['user_avatars', 'organization_logos']
+
+
+def is_path_allowed(path, organization_id):
     """
-    Serve a file from storage with authentication and authorization checks.
-    
-    This view is used by SecureFileStorage to serve private files, ensuring
-    that only authenticated users with proper permissions can access them.
-    
-    Args:
-        request: The HTTP request
-        path: The file path within storage
-        
-    Returns:
-        FileResponse or HttpResponse with the file content
+    Basic organization-based authorization: the file belongs to the
+    organization (its ID is in the path) or to a shared collection.
+    This can be enhanced based on your storage structure.
     """
-    # Check if file exists
+    return str(organization_id) in path or any(
+        path.startswith(collection) for collection in SHARED_COLLECTIONS
+    )
+
+
+def _check_file_exists(path):
+    # Thumbnails are rendered on first request
     if not default_storage.exists(path):
-        logger.warning(f"Protected file not found: {path}")
-        raise Http404("File not found")
-    
-    # Get organization context
-    current_org = get_current_organization()
-    
-    # Basic organization-based authorization
-    # This can be enhanced with more specific permission checks
-    if current_org:
-        # Check if the file belongs to the current organization
-        # This assumes files are stored with organization context in the path
-        org_id = str(current_org.id)
-        
-        # Skip organization check for superusers
-        if not request.user.is_superuser:
-            # Check if the file path contains organization ID or collection
-            # This is a simple check that can be enhanced based on your storage structure
-            if org_id not in path and not any(
-                path.startswith(collection) for collection in ['user_avatars', 'organization_logos']
-            ):
-                logger.warning(f"Unauthorized file access attempt: {path} by user {request.user.username}")
-                raise Http404("File not found")
-    
+        thumbnail = get_original_path(path)
+        if thumbnail is None or not default_storage.exists(thumbnail[0]) or not make_thumbnail(*thumbnail):
+            logger.warning(f"Protected file not found: {path}")
+            raise Http404("File not found")
+
+
+def _serve_file(request, path):
+    try:
+        absolute_path = default_storage.path(path)
+    except NotImplementedError:
+        # Remote storage: no local file for nginx to send
+        absolute_path = None
+    if absolute_path is not None:
+        # Streamed with conditional and range support, or handed to nginx
+        # with X-Accel-Redirect when DOWNLOAD_X_ACCEL_REDIRECT is enabled
+        return file_download_response(request, absolute_path)
+
     try:
         # Get file from storage
         file = default_storage.open(path)
@@ -69,3 +70,56 @@ def serve_protected_file(request, path):
     except Exception as e:
         logger.error(f"Error serving protected file {path}: {str(e)}")
         raise Http404("Error accessing file")
+
+
+@login_required
+def serve_protected_file(request, path):
+    """
+    Serve a file from storage with authentication and authorization checks.
+    
+    This view is used by SecureFileStorage to serve private files, ensuring
+    that only authenticated users with proper permissions can access them.
+    
+    Args:
+        request: The HTTP request
+        path: The file path within storage
+        
+    Returns:
+        FileResponse or HttpResponse with the file content
+    """
+    # Get organization context
+    current_org = get_current_organization()
+    
+    # Skip organization check for superusers. Checked before the file is
+    # looked up, as a missing thumbnail is rendered and written to storage
+    if current_org and not request.user.is_superuser:
+        if not is_path_allowed(path, current_org.id):
+            logger.warning(f"Unauthorized file access attempt: {path} by user {request.user.username}")
+            raise Http404("File not found")
+    
+    _check_file_exists(path)
+    return _serve_file(request, path)
+
+
+def serve_signed_file(request, expires, scope, signature, path):
+    """
+    Serve a file from storage through a signed URL issued by
+    SecureFileStorage.url().
+
+    The signature covers the path, expiry time and scope (the organization
+    the URL was issued in), so the request is authorized without the
+    session or the database; OrganizationMiddleware skips these paths. The
+    response may be cached, by browsers and shared caches, until the URL
+    expires.
+    """
+    if not verify_signature(path, expires, scope, signature):
+        return HttpResponseForbidden()
+    if scope not in (NO_SCOPE, SUPERUSER_SCOPE) and not is_path_allowed(path, scope):
+        logger.warning(f"Unauthorized signed file access attempt: {path} in scope {scope}")
+        return HttpResponseForbidden()
+
+    _check_file_exists(path)
+    response = _serve_file(request, path)
+    patch_cache_control(response, public=True, max_age=max(0, expires - int(time.time())))
+    response['Expires'] = http_date(expires)
+    return response
@@ -0,0 +1,10 @@
+from django import template
+from core.thumbnails import get_thumbnail_url
+
+register = template.Library()
+
+
+@register.filter
+def thumbnail(image_field, size='md'):
+    """`{{ profile.avatar|thumbnail:"sm" }}`: URL of a resized copy of the image."""
+    return get_thumbnail_url(image_field, size)
@@ -0,0 +1,97 @@
+"""
+Throughput comparison of the sync and async Sales read endpoints under ASGI.
+
+Fires the same number of GET requests with the same concurrency at
+`/api/sales/` (sync DRF view) and `/api/async/sales/` (async view) and prints
+requests per second and latency percentiles for each. It uses only the
+standard library, so it can run from any environment.
+
+Start the ASGI server first, e.g.:
+
+    daphne -b 127.0.0.1 -p 8000 core.asgi:application
+
+Run with: python tests/scripts/bench_async_api.py --url http://127.0.0.1:8000
+
+Options:
+    --concurrency   number of concurrent clients (default 100)
+    --requests      total requests per endpoint (default 2000)
+    --query         query string appended to both endpoints (default page_size=100)
+    --token         API token sent as `Authorization: Token <token>`
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+async def fetch(host, port, path, headers):
+    reader, writer = await asyncio.open_connection(host, port)
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n{headers}\r\n"
+    writer.write(request.encode())
+    await writer.drain()
+    status_line = await reader.readline()
+    await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return int(status_line.split()[1])
+
+
+async def run(host, port, path, headers, total, concurrency):
+    latencies = []
+    statuses = {}
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                status = await fetch(host, port, path, headers)
+            except OSError:
+                status = 'error'
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return elapsed, latencies, statuses
+
+
+def report(name, elapsed, latencies, statuses):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+    print(f"{name:<8} {len(latencies) / elapsed:8.1f} req/s   p50 {p50:7.1f} ms   p95 {p95:7.1f} ms   statuses {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--query', default='page_size=100')
+    parser.add_argument('--token', default='')
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    headers = f"Authorization: Token {args.token}\r\n" if args.token else ''
+    endpoints = [
+        ('sync', f'/api/sales/?{args.query}'),
+        ('async', f'/api/async/sales/?{args.query}'),
+    ]
+
+    print(f"{args.requests} requests per endpoint, concurrency {args.concurrency}\n")
+    for name, path in endpoints:
+        elapsed, latencies, statuses = asyncio.run(
+            run(url.hostname, url.port or 80, path, headers, args.requests, args.concurrency)
+        )
+        report(name, elapsed, latencies, statuses)
+
+
+if __name__ == '__main__':
+    main()
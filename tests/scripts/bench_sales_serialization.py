@@ -0,0 +1,78 @@
+"""
+Benchmark script comparing the Sales API read paths.
+
+This script times serializing and rendering Sales rows with:
+- the ModelSerializer path (`SalesSerializer(instance=obj).data` + JSONRenderer)
+- the fast path (`SalesFastSerializer` over `values_list` rows + FastJSONRenderer)
+
+Rows are inserted inside a transaction that is rolled back at the end, so the
+database is left untouched. Rows are attached to the first organization, so
+at least one must exist. Set BENCH_ROWS to change the number of rows.
+
+Run with: python manage.py shell < tests/scripts/bench_sales_serialization.py
+"""
+
+import os
+import time
+import datetime
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from apps.api.renderers import FastJSONRenderer
+from apps.api.serializers import SalesSerializer, SalesFastSerializer
+from apps.common.models import Sales
+from apps.organizations.models import Organization
+
+ROWS = int(os.environ.get('BENCH_ROWS', 20000))
+REPEAT = 3
+
+
+def model_serializer_path():
+    data = [SalesSerializer(instance=obj).data for obj in Sales.unfiltered_objects.all()]
+    return JSONRenderer().render({'data': data, 'success': True})
+
+
+def fast_path():
+    serializer = SalesFastSerializer()
+    data = serializer.serialize(serializer.get_rows(Sales.unfiltered_objects.all()))
+    return FastJSONRenderer().render({'data': data, 'success': True})
+
+
+def best_of(func):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmark():
+    organization = Organization.objects.order_by('created_at').first()
+    with transaction.atomic():
+        Sales.unfiltered_objects.bulk_create([
+            Sales(
+                Product=f'Product {i}',
+                BuyerEmail=f'buyer{i}@example.com',
+                PurchaseDate=datetime.date(2024, 1, 1) + datetime.timedelta(days=i % 365),
+                Country='US',
+                Price=i * 1.5,
+                Quantity=i % 10,
+                organization=organization,
+            )
+            for i in range(ROWS)
+        ], batch_size=1000)
+
+        total = Sales.unfiltered_objects.count()
+        slow = best_of(model_serializer_path)
+        fast = best_of(fast_path)
+
+        print(f"Rows serialized:       {total}")
+        print(f"ModelSerializer path:  {slow * 1000:.1f} ms")
+        print(f"Fast path:             {fast * 1000:.1f} ms")
+        print(f"Speedup:               {slow / fast:.1f}x")
+
+        transaction.set_rollback(True)
+
+
+run_benchmark()